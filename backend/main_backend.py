@@ -1,12 +1,77 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 import os
+import sys
+
+# The API runs from backend/ (`uvicorn main:app`) but also imports the shared
+# packages at the repository root (services/, safecore_sdk/): put the root on
+# sys.path unless PYTHONPATH already provides them.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+# Started before anything heavy is imported, so the report sees every import
+from src.core.startup_report import StartupReport
+startup_report = StartupReport()
+
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
 
 from src.core.phoenix_service import PhoenixService
+from proposal_generator import ProposalGenerator
+from src.core.schemas import FastJSONResponse
+from src.core.static_assets import STATIC_DIR, StaticAssetManifest
+from src.core.image_pipeline import InvalidImage
+from src.core.upload import UploadTooLarge, read_binary_upload, read_multipart_upload
+from src.core.batch import (
+    BATCH_CONCURRENCY, encode_ndjson, iter_file_chunks, iter_json_list, iter_ndjson, run_batch, spool_stream
+)
+
+phoenix_service = PhoenixService()
+proposal_generator = ProposalGenerator()
+# Frontend build, loaded into memory (with gzip/br variants) during startup
+static_assets = StaticAssetManifest()
+
+# SafeCore: manifests of the bundled cores, validated once and watched for changes.
+# SAFECORE_MANIFEST_ROOTS lists core directories; SAFECORE_CORES_DIR registers
+# every subdirectory of it that has a manifest.json.
+compliance_registry = None
+if os.getenv("SAFECORE_MANIFEST_ROOTS"):
+    from safecore_sdk.compliance import ComplianceRegistry
+    compliance_registry = ComplianceRegistry()
+elif os.getenv("SAFECORE_CORES_DIR"):
+    from safecore_sdk.compliance import ComplianceRegistry
+    compliance_registry = ComplianceRegistry.discover(os.environ["SAFECORE_CORES_DIR"])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm-up: open the pooled Med-Gemma gateway client once (closed on shutdown),
+    # pre-connect to the gateway and start the image workers before taking traffic
+    await phoenix_service.startup(startup_report)
+    if os.path.isdir(STATIC_DIR):
+        with startup_report.phase("static_assets"):
+            await asyncio.to_thread(static_assets.load, STATIC_DIR)
+    if compliance_registry:
+        with startup_report.phase("compliance_registry"):
+            await asyncio.to_thread(compliance_registry.start)
+    startup_report.mark_ready()
+    try:
+        yield
+    finally:
+        if compliance_registry:
+            compliance_registry.stop()
+        await phoenix_service.shutdown()
+
+app = FastAPI(title="Phoenix Wound Clinic API", version="1.0.0", lifespan=lifespan)
 
-app = FastAPI(title="Phoenix Wound Clinic API", version="1.0.0")
+# SafeCore: transparently decrypt x-safecore-encrypted request bodies.
+# Added before CORS so CORS stays the outermost layer (preflights skip decryption).
+if os.getenv("SAFECORE_CLIENT_SECRET"):
+    from safecore_sdk.middleware import SafeCoreDecryptionMiddleware
+    app.add_middleware(SafeCoreDecryptionMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,14 +81,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files (Frontend Build)
-# This directory will be populated by the Docker build process
-static_dir = "static"
-if os.path.exists(static_dir):
-    app.mount("/assets", StaticFiles(directory=f"{static_dir}/assets"), name="assets")
-    # You might need to mount other root files like manifest.json here or handle them in the catch-all
-
-phoenix_service = PhoenixService()
+# Static files (Frontend Build)
+# The directory (PHOENIX_STATIC_DIR, default "static") is populated by the Docker build
+# process and served from the in-memory manifest by the catch-all route below:
+# /assets/* with immutable caching, index.html and root files with ETag revalidation.
 
 @app.get("/")
 def health_check():
@@ -32,28 +93,134 @@ def health_check():
 @app.post("/api/analyze_wound")
 async def analyze_wound(data: dict):
     # This will route to Med-Gemma via PhoenixService
-    return phoenix_service.analyze_wound_image(data)
+    try:
+        return FastJSONResponse(await phoenix_service.analyze_wound_image(data))
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/analyze_wound/upload")
+async def analyze_wound_upload(request: Request):
+    # Photo as multipart ("image" part + clinical fields) or as a raw image body
+    # with the clinical fields in the query string; streamed to a capped temp file.
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            image, fields = await read_multipart_upload(request)
+        else:
+            image, fields = await read_binary_upload(request), dict(request.query_params)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return FastJSONResponse(await phoenix_service.analyze_wound_image(fields, image=image))
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        image.close()
+
+@app.post("/api/analyze_wound/batch")
+async def analyze_wound_batch(request: Request, concurrency: int = BATCH_CONCURRENCY):
+    # Accepts a JSON array or an NDJSON stream (application/x-ndjson) of analysis payloads.
+    # Results are streamed back as NDJSON in completion order; per-item errors are inline.
+    content_type = request.headers.get("content-type", "")
+    cleanup = None
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        spool = await spool_stream(request.stream())
+        items = iter_ndjson(iter_file_chunks(spool))
+        cleanup = BackgroundTask(spool.close)
+    else:
+        try:
+            payload = await request.json()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of analysis payloads")
+        items = iter_json_list(payload)
+
+    outcomes = run_batch(phoenix_service.analyze_wound_image, items, concurrency)
+    return StreamingResponse(encode_ndjson(outcomes), media_type="application/x-ndjson", background=cleanup)
 
 @app.get("/api/stats/supply_usage")
-async def get_supply_stats():
-    # Only for authorized clinic admins
-    return phoenix_service.get_supply_stats()
+def get_supply_stats(quarter: str = None):
+    # Only for authorized clinic admins. Served from materialized aggregates.
+    # Sync route: a summary miss queries SQLite under the store lock, in the threadpool
+    try:
+        return FastJSONResponse(phoenix_service.get_supply_stats(quarter))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/stats/history")
+def query_history(table: str, start: str, end: str, value: str, by: str,
+                  clinic: str = None, category: str = None):
+    # Ad-hoc aggregate over the columnar history, e.g.
+    # /api/stats/history?table=usage&start=2023-01-01&end=2026-01-01&value=units&by=category&clinic=north
+    filters = {name: wanted for name, wanted in (("clinic", clinic), ("category", category)) if wanted}
+    try:
+        return FastJSONResponse(phoenix_service.stats.query_history(table, start, end, value, by, filters))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/compliance")
+def get_compliance():
+    # In-memory snapshot; no manifest is read on this path
+    if compliance_registry is None:
+        return {"enabled": False, "compliant": None, "cores": {}}
+    return {
+        "enabled": True,
+        "compliant": compliance_registry.is_compliant(),
+        "cores": compliance_registry.snapshot(),
+    }
+
+@app.post("/api/stats/supply_usage/events")
+def record_supply_usage(event: dict):
+    # Sync route: FastAPI runs it in the threadpool, off the event loop
+    try:
+        event_id = phoenix_service.record_supply_usage(event)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"recorded": True, "event_id": event_id}
+
+@app.get("/api/stats/analysis_cache")
+async def get_analysis_cache_stats():
+    # Hit/miss counters of the Med-Gemma result cache
+    return FastJSONResponse(phoenix_service.get_cache_stats())
+
+@app.get("/api/stats/startup")
+async def get_startup_report():
+    # Per-module import times and warm-up phases of this instance (cold start budget)
+    return FastJSONResponse(startup_report.as_dict())
+
+@app.post("/api/proposals")
+async def generate_proposal(data: dict):
+    return FastJSONResponse(await proposal_generator.generate(data))
+
+@app.post("/api/proposals/stream")
+async def stream_proposal(data: dict):
+    # Server-Sent Events: text arrives as the gateway produces it.
+    # If the client disconnects, the generator is closed and the gateway call with it.
+    return StreamingResponse(
+        proposal_generator.stream_sse(data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # Catch-all for SPA (must be last)
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
+async def serve_spa(full_path: str, request: Request):
     # If API path not found, let it 404 naturally (FastAPI handles it if defined above, 
     # but here we might capture it. We should return index.html only for non-api routes)
     if full_path.startswith("api"):
         return {"error": "API endpoint not found"}
         
-    if os.path.exists(static_dir):
+    if static_assets.loaded:
         # Serve specific root files if they exist in static root
-        file_path = os.path.join(static_dir, full_path)
-        if os.path.isfile(file_path):
-            return FileResponse(file_path)
-            
-        # Default to index.html for SPA routing
-        return FileResponse(os.path.join(static_dir, "index.html"))
+        asset = static_assets.lookup(full_path)
+        if asset is None:
+            if full_path.startswith("assets/"):
+                raise HTTPException(status_code=404, detail="Not Found")
+            # Default to index.html for SPA routing
+            asset = static_assets.index
+        if asset is not None:
+            return static_assets.respond(asset, request.headers)
         
     return {"status": "Backend Only Mode (Frontend not built)"}
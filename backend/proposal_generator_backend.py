@@ -1,6 +1,19 @@
 import httpx
 import os
 import json
+import logging
+import re
+from typing import AsyncIterator
+
+from services.resilience import get_upstream
+from src.core.schemas import ProposalResponse
+
+PROPOSAL_TIMEOUT_S = float(os.getenv("PROPOSAL_TIMEOUT", "60"))
+
+logger = logging.getLogger(__name__)
+
+_STREAM_DONE = object()
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
 
 class ProposalGenerator:
     """
@@ -8,55 +21,182 @@ class ProposalGenerator:
     """
     def __init__(self):
         self.gateway_url = os.environ.get("GATEWAY_URL", "http://localhost:4000/v1/copilot/invoke")
+        self.upstream = get_upstream("proposal_gateway", timeout=PROPOSAL_TIMEOUT_S)
         self.role_definition = """
         Rol: Actúa como un Analista de Economía de la Salud y Gerente de Compras Hospitalarias.
         Tarea: Generar una propuesta de alta para la inclusión de una nueva tecnología médica en el catálogo del sistema institucional "Phoenix".
         Objetivo: Justificar la adquisición basándose en el modelo de "Costo Total del Procedimiento" y eficiencia operativa.
         """
 
-    async def generate(self, data: dict) -> dict:
+    async def generate(self, data: dict) -> ProposalResponse:
         """
         Generates the proposal text based on input data.
         """
-        prompt = self._construct_prompt(data)
-        
+        payload = self._build_payload(data)
+
+        async with httpx.AsyncClient() as client:
+            try:
+                # We assume the gateway accepts a POST with this structure
+                async def post():
+                    response = await client.post(self.gateway_url, json=payload, timeout=PROPOSAL_TIMEOUT_S)
+                    response.raise_for_status()
+                    return response
+
+                result = (await self.upstream.call(post, operation="generate")).json()
+                content = self._extract_content(result)
+                
+                return ProposalResponse(
+                    success=True,
+                    proposal_text=content,
+                    metadata=self._metadata()
+                )
+            except Exception as e:
+                logger.warning("Error calling gateway: %s", e)
+                # Fallback purely for demonstration if Gateway is offline/mocked
+                return ProposalResponse(
+                    success=False,
+                    error=str(e),
+                    fallback_msg="Gateway unavailable. Ensure GATEWAY_URL is reachable."
+                )
+
+    async def generate_stream(self, data: dict) -> AsyncIterator[str]:
+        """
+        Streaming variant of generate(): yields text fragments as the gateway
+        produces them. Understands SSE ("data: ..." lines), NDJSON and plain
+        chunked text; a gateway that ignores "stream" and answers with one
+        JSON document yields the whole proposal at once.
+
+        Closing the generator (e.g. the HTTP client disconnected) closes the
+        upstream response, which cancels the gateway call.
+        """
+        payload = {**self._build_payload(data), "stream": True}
+        async with httpx.AsyncClient(timeout=PROPOSAL_TIMEOUT_S) as client:
+            async def send():
+                request = client.build_request("POST", self.gateway_url, json=payload)
+                response = await client.send(request, stream=True)
+                if response.is_error:
+                    await response.aread()
+                    await response.aclose()
+                    response.raise_for_status()
+                return response
+
+            # The circuit breaker and timeout cover the wait for the first byte
+            response = await self.upstream.call(send, operation="generate_stream")
+            try:
+                if response.headers.get("content-type", "").startswith("application/json"):
+                    yield self._extract_content(json.loads(await response.aread()))
+                    return
+                async for text in self._decode_stream(response):
+                    if text is _STREAM_DONE:
+                        break
+                    if text:
+                        yield text
+            finally:
+                await response.aclose()
+
+    async def stream_sse(self, data: dict) -> AsyncIterator[bytes]:
+        """
+        generate_stream() encoded as Server-Sent Events: "chunk" events with
+        {"text": ...}, then one "done" (with metadata) or "error" event.
+        """
+        try:
+            async for text in self.generate_stream(data):
+                yield _sse_event("chunk", {"text": text})
+        except Exception as e:
+            logger.warning("Error streaming from gateway: %s", e)
+            yield _sse_event("error", {
+                "error": str(e),
+                "fallback_msg": "Gateway unavailable. Ensure GATEWAY_URL is reachable."
+            })
+            return
+        yield _sse_event("done", {"success": True, "metadata": self._metadata()})
+
+    def _build_payload(self, data: dict) -> dict:
         # Payload for the AI Gateway (Copilot/Gemini)
         # Adjusting structure based on typical Gateway usage seen in Phoenix
-        payload = {
+        return {
             "type": "text_generation",
             "app": "phoenix",
-            "prompt": prompt,
+            "prompt": self._construct_prompt(data),
             "system_instruction": self.role_definition,
             "temperature": 0.3 # Low temperature for professional/analytical output
         }
 
-        async with httpx.AsyncClient() as client:
-            try:
-                # We assume the gateway accepts a POST with this structure
-                response = await client.post(self.gateway_url, json=payload, timeout=60.0)
-                response.raise_for_status()
-                result = response.json()
-                
-                # Assuming the gateway returns something like {"content": "..."} or {"response": "..."}
-                # If we don't know the exact structure, we try to extract common fields
-                content = result.get("content") or result.get("response") or result.get("text") or str(result)
-                
-                return {
-                    "success": True,
-                    "proposal_text": content,
-                    "metadata": {
-                        "model": "HealthEconomicsAI",
-                        "timestamp": "now"
-                    }
-                }
-            except Exception as e:
-                print(f"[ProposalGenerator] Error calling gateway: {e}")
-                # Fallback purely for demonstration if Gateway is offline/mocked
-                return {
-                    "success": False,
-                    "error": str(e), 
-                    "fallback_msg": "Gateway unavailable. Ensure GATEWAY_URL is reachable."
-                }
+    @staticmethod
+    def _extract_content(result) -> str:
+        # Assuming the gateway returns something like {"content": "..."} or {"response": "..."}
+        # If we don't know the exact structure, we try to extract common fields
+        if not isinstance(result, dict):
+            return str(result)
+        return result.get("content") or result.get("response") or result.get("text") or str(result)
+
+    @classmethod
+    async def _decode_stream(cls, response: httpx.Response):
+        """
+        Text chunks of a streamed answer, whitespace and line breaks included.
+        The format comes from the content type, or is sniffed from the first
+        chunk: SSE, NDJSON, or plain text passed through as it arrives.
+        """
+        chunks = response.aiter_text()
+        first = ""
+        async for first in chunks:
+            if first:
+                break
+        content_type = response.headers.get("content-type", "")
+        head = first.lstrip()
+        if "event-stream" in content_type or head.startswith(("data:", "event:", "id:", ":")):
+            data_lines = []  # "data:" lines of the event being received
+            async for line in _split_lines(first, chunks):
+                if line:
+                    field, _, value = line.partition(":")
+                    if field == "data":
+                        data_lines.append(value[1:] if value.startswith(" ") else value)
+                    continue
+                if data_lines:
+                    yield cls._parse_stream_chunk("\n".join(data_lines))
+                    data_lines = []
+            if data_lines:
+                yield cls._parse_stream_chunk("\n".join(data_lines))
+        elif "ndjson" in content_type or "jsonl" in content_type or head.startswith("{"):
+            async for line in _split_lines(first, chunks):
+                if line.strip():
+                    text = cls._parse_stream_chunk(line)
+                    # A line that is not JSON keeps the break aiter_text split off
+                    yield text + "\n" if text is line else text
+        else:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+    @staticmethod
+    def _parse_stream_chunk(data: str):
+        if data == "[DONE]":
+            return _STREAM_DONE
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            return data
+        if chunk is None:
+            return None
+        if isinstance(chunk, dict):
+            # Incremental fields first ("delta"/"token"), then whole-message fields
+            for key in ("delta", "token", "content", "response", "text"):
+                if isinstance(chunk.get(key), str):
+                    return chunk[key]
+            if chunk.get("done"):
+                return _STREAM_DONE
+            return None
+        if isinstance(chunk, str):
+            return chunk
+        # Plain text that happens to parse as a number, boolean or list
+        return data
+
+    @staticmethod
+    def _metadata() -> dict:
+        return {
+            "model": "HealthEconomicsAI",
+            "timestamp": "now"
+        }
 
     def _construct_prompt(self, data: dict) -> str:
         """
@@ -101,3 +241,26 @@ class ProposalGenerator:
         Solicitud Final: Genera el documento formal.
         """
         return prompt
+
+
+async def _split_lines(first: str, chunks) -> AsyncIterator[str]:
+    """Lines of a text stream, without their terminator (\\n, \\r\\n or \\r)."""
+    buffer = first
+    while True:
+        # A trailing "\r" may be the first half of a "\r\n" in the next chunk
+        end = len(buffer) - 1 if buffer.endswith("\r") else len(buffer)
+        start = 0
+        for match in _LINE_BREAK.finditer(buffer, 0, end):
+            yield buffer[start:match.start()]
+            start = match.end()
+        buffer = buffer[start:]
+        try:
+            buffer += await chunks.__anext__()
+        except StopAsyncIteration:
+            break
+    if buffer:
+        yield buffer[:-1] if buffer.endswith("\r") else buffer
+
+
+def _sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
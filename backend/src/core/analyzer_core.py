@@ -1,3 +1,33 @@
+from services.timers_lexicon import TIMERS_MATCHER
+
+# RESVECH 2.0 components, in the order they are summed
+RESVECH_COMPONENTS = ("size", "depth", "edges", "tissue_type", "exudate", "infection_inflammation")
+RESVECH_MAX_SCORE = 35
+BIOFILM_AGGRESSIVE_THRESHOLD = 5
+INFECTION_SUSPECTED_THRESHOLD = 3  # I status flips when infection_inflammation exceeds this
+
+# TIMERS status tables; the list index is the status code used by the classifiers
+TIMERS_STATUS = {
+    "T": [
+        {"status": "Viable", "action": "Maintain healthy bed"},
+        {"status": "Non-viable tissue", "action": "Debridement required"},
+    ],
+    "I": [
+        {"status": "Controlled", "action": "Monitor for signs"},
+        {"status": "Infection/Biofilm suspected", "action": "Antimicrobials/Anti-biofilm agents"},
+    ],
+    "M": [
+        {"status": "Balanced", "action": "Protect moisture balance"},
+        {"status": "Maceration risk", "action": "Absorbent dressings"},
+        {"status": "Desiccated", "action": "Hydrate wound bed"},
+    ],
+    "E": [
+        {"status": "Advancing", "action": "Protect wound margin"},
+        {"status": "Stalled edges", "action": "Address underlying causes/Biofilm"},
+    ],
+}
+
+
 class WoundAnalyzer:
     """
     Implements clinical logic for wound assessment:
@@ -18,57 +48,64 @@ class WoundAnalyzer:
         - infection_inflammation: 0-10
         """
         score = 0
-        score += parameters.get("size", 0)
-        score += parameters.get("depth", 0)
-        score += parameters.get("edges", 0)
-        score += parameters.get("tissue_type", 0)
-        score += parameters.get("exudate", 0)
-        score += parameters.get("infection_inflammation", 0)
-        return min(score, 35)
+        for component in RESVECH_COMPONENTS:
+            score += parameters.get(component, 0)
+        return min(score, RESVECH_MAX_SCORE)
 
     def get_timers_assessment(self, parameters: dict) -> dict:
         """
         Generates TIMERS assessment based on clinical findings.
         """
-        assessment = {}
-        
-        # T: Tissue
-        tissue = parameters.get("tissue_type_desc", "").lower()
-        if "necrotic" in tissue or "slough" in tissue:
-            assessment["T"] = {"status": "Non-viable tissue", "action": "Debridement required"}
-        else:
-            assessment["T"] = {"status": "Viable", "action": "Maintain healthy bed"}
-            
+        codes = {
+            "T": self.classify_tissue(parameters.get("tissue_type_desc", "")),
+            "I": self.classify_infection(parameters.get("infection_inflammation", 0)),
+            "M": self.classify_moisture(parameters.get("exudate_desc", "")),
+            "E": self.classify_edges(parameters.get("edges_desc", "")),
+        }
+        return {key: dict(TIMERS_STATUS[key][code]) for key, code in codes.items()}
+
+    # Per-dimension classifiers. They return the index into TIMERS_STATUS so the
+    # scalar path and the cohort (columnar) path share exactly the same rules.
+    # Descriptions are matched against the English/Spanish TIMERS lexicon.
+
+    @staticmethod
+    def classify_tissue(description: str) -> int:
+        # T: Tissue (necrotic/slough, necrótico/esfacelo...)
+        return 1 if TIMERS_MATCHER.matches(description, "tissue_nonviable") else 0
+
+    @staticmethod
+    def classify_infection(score) -> int:
         # I: Infection/Inflammation
-        inf_score = parameters.get("infection_inflammation", 0)
-        if inf_score > 3:
-            assessment["I"] = {"status": "Infection/Biofilm suspected", "action": "Antimicrobials/Anti-biofilm agents"}
-        else:
-            assessment["I"] = {"status": "Controlled", "action": "Monitor for signs"}
-            
+        return 1 if score > INFECTION_SUSPECTED_THRESHOLD else 0
+
+    @staticmethod
+    def classify_moisture(description: str) -> int:
         # M: Moisture
-        exudate = parameters.get("exudate_desc", "").lower()
-        if "high" in exudate or "heavy" in exudate:
-            assessment["M"] = {"status": "Maceration risk", "action": "Absorbent dressings"}
-        elif "dry" in exudate:
-            assessment["M"] = {"status": "Desiccated", "action": "Hydrate wound bed"}
-        else:
-            assessment["M"] = {"status": "Balanced", "action": "Protect moisture balance"}
-            
+        found = TIMERS_MATCHER.scan(description)
+        if "moisture_high" in found:
+            return 1
+        if "moisture_dry" in found:
+            return 2
+        return 0
+
+    @staticmethod
+    def classify_edges(description: str) -> int:
         # E: Edges
-        edges = parameters.get("edges_desc", "").lower()
-        if "non-advancing" in edges or "undermined" in edges:
-            assessment["E"] = {"status": "Stalled edges", "action": "Address underlying causes/Biofilm"}
-        else:
-            assessment["E"] = {"status": "Advancing", "action": "Protect wound margin"}
-            
-        return assessment
+        return 1 if TIMERS_MATCHER.matches(description, "edges_stalled") else 0
+
+    def score_cohort(self, columns) -> dict:
+        """
+        Columnar RESVECH/TIMERS scoring for whole cohorts (NumPy arrays or a DataFrame).
+        See CohortScorer for the input/output layout.
+        """
+        from .cohort import CohortScorer
+        return CohortScorer(self).score(columns)
 
     def get_biofilm_protocol(self, infection_score: int) -> list:
         """
         Specific protocols for biofilm management.
         """
-        if infection_score >= 5:
+        if infection_score >= BIOFILM_AGGRESSIVE_THRESHOLD:
             return [
                 "Aggressive debridement (Sharp/Mechanical)",
                 "Topical anti-biofilm agents (e.g., Cadexomer Iodine)",
@@ -0,0 +1,142 @@
+"""
+Phoenix Core - Análisis por lotes
+Ejecuta muchos payloads de /api/analyze_wound con concurrencia acotada y entrega
+cada resultado en cuanto termina (NDJSON), con memoria constante por lote.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable
+
+from .schemas import encode_json
+
+BATCH_CONCURRENCY = int(os.getenv("PHOENIX_BATCH_CONCURRENCY", "8"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("PHOENIX_BATCH_MAX_CONCURRENCY", "64"))
+BATCH_SPOOL_MEMORY_BYTES = int(os.getenv("PHOENIX_BATCH_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+BATCH_READ_CHUNK_BYTES = 64 * 1024
+
+_DONE = object()
+
+
+class InvalidItem:
+    """Placeholder for an input line that could not be decoded."""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+async def iter_json_list(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def spool_stream(chunks: AsyncIterable[bytes]) -> "tempfile.SpooledTemporaryFile":
+    """
+    Copies a request body into a spooled temp file (RAM up to
+    BATCH_SPOOL_MEMORY_BYTES, disk beyond). The body has to be drained before
+    the streaming response starts, because the response listens on the same
+    ASGI receive channel for client disconnects.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=BATCH_SPOOL_MEMORY_BYTES)
+    async for chunk in chunks:
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def iter_file_chunks(file) -> AsyncIterator[bytes]:
+    while True:
+        chunk = file.read(BATCH_READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """
+    Decodes an NDJSON byte stream line by line without buffering the whole body.
+    Undecodable lines are yielded as InvalidItem so they are reported inline.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if buffer.strip():
+        yield _decode_line(buffer)
+
+
+async def run_batch(analyze: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                    items: AsyncIterable[Any],
+                    concurrency: int = BATCH_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs analyze() over items with at most `concurrency` analyses in flight and
+    yields {"index", "ok", "result"|"error"} in completion order.
+
+    Input is only pulled when a slot is free and a finished result only frees
+    its slot once the consumer has room for it, so a slow client applies
+    backpressure all the way to the request body.
+    """
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+    slots = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    tasks = set()
+
+    async def run_one(index: int, item: Any):
+        try:
+            try:
+                if isinstance(item, InvalidItem):
+                    raise ValueError(item.error)
+                if not isinstance(item, dict):
+                    raise ValueError("Each batch item must be a JSON object")
+                outcome = {"index": index, "ok": True, "result": await analyze(item)}
+            except Exception as e:
+                outcome = {"index": index, "ok": False, "error": str(e)}
+            await results.put(outcome)
+        finally:
+            slots.release()
+
+    async def produce():
+        index = 0
+        try:
+            async for item in items:
+                await slots.acquire()
+                task = asyncio.create_task(run_one(index, item))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                index += 1
+        except Exception as e:
+            await results.put({"index": index, "ok": False, "error": f"Batch input error: {e}"})
+        if tasks:
+            await asyncio.gather(*list(tasks))
+        await results.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            outcome = await results.get()
+            if outcome is _DONE:
+                break
+            yield outcome
+    finally:
+        # Client went away (or the batch finished): stop reading input and
+        # cancel whatever is still running.
+        producer.cancel()
+        for task in list(tasks):
+            task.cancel()
+
+
+async def encode_ndjson(outcomes: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for outcome in outcomes:
+        yield encode_json(outcome) + b"\n"
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return InvalidItem(f"Invalid JSON line: {e}")
@@ -1,3 +1,78 @@
+from bisect import bisect_left, bisect_right
+
+# RESVECH threshold rules -> parameter they are evaluated against
+RESVECH_MIN_RULES = {
+    "resvech_min_tissue": "tissue_type",
+    "resvech_min_infection": "infection_inflammation",
+    "resvech_min_exudate": "exudate",
+}
+RESVECH_MAX_RULES = {
+    "resvech_max_infection": "infection_inflammation",
+    "resvech_max_slough": "tissue_type",
+}
+STATUS_MEMO_SIZE = 4096
+
+
+class CatalogIndex:
+    """
+    Compiled form of the catalog rules, built once per catalog load.
+
+    - timers: per TIMERS dimension, lowercased trigger token -> product positions.
+      Matches for a given (dimension, status) are memoized, since the analyzer
+      only produces a handful of distinct statuses.
+    - min/max: per RESVECH rule, thresholds sorted ascending with the product
+      positions, so the products crossing a threshold are a bisect slice.
+    """
+
+    def __init__(self, products: list):
+        self.products = products
+        self.timers = {}
+        self.min_rules = {}
+        self.max_rules = {}
+        self._status_matches = {}
+
+        for position, product in enumerate(products):
+            rules = product["rules"]
+            for key, triggers in rules.get("timers", {}).items():
+                tokens = self.timers.setdefault(key, {})
+                for trigger in triggers:
+                    tokens.setdefault(trigger.lower(), set()).add(position)
+            for compiled, rule_names in ((self.min_rules, RESVECH_MIN_RULES), (self.max_rules, RESVECH_MAX_RULES)):
+                for rule in rule_names:
+                    if rule in rules:
+                        compiled.setdefault(rule, []).append((rules[rule], position))
+
+        for compiled in (self.min_rules, self.max_rules):
+            for rule, entries in compiled.items():
+                entries.sort(key=lambda entry: entry[0])
+                compiled[rule] = ([threshold for threshold, _ in entries], [position for _, position in entries])
+
+    def timers_matches(self, key: str, status: str) -> frozenset:
+        cache_key = (key, status)
+        matches = self._status_matches.get(cache_key)
+        if matches is None:
+            status_lower = status.lower()
+            matches = frozenset(
+                position
+                for token, positions in self.timers.get(key, {}).items() if token in status_lower
+                for position in positions
+            )
+            if len(self._status_matches) >= STATUS_MEMO_SIZE:
+                self._status_matches.clear()
+            self._status_matches[cache_key] = matches
+        return matches
+
+    def at_least(self, rule: str, value) -> list:
+        """Positions whose `rule` threshold is <= value (inclusion rules)."""
+        thresholds, positions = self.min_rules.get(rule, ((), ()))
+        return positions[:bisect_right(thresholds, value)]
+
+    def exceeded(self, rule: str, value) -> list:
+        """Positions whose `rule` threshold is < value (exclusion rules)."""
+        thresholds, positions = self.max_rules.get(rule, ((), ()))
+        return positions[:bisect_left(thresholds, value)]
+
+
 class CatalogManager:
     """
     Manages sponsored products with granular clinical alignment rules.
@@ -59,50 +134,54 @@ class CatalogManager:
                 }
             }
         ]
+        self.rebuild_index()
+
+    def load_products(self, products: list):
+        """
+        Replaces the catalog (e.g. a full formulary) and recompiles the rule index.
+        """
+        self.products = list(products)
+        self.rebuild_index()
+
+    def rebuild_index(self):
+        """
+        Must be called after mutating self.products in place.
+        """
+        self.index = CatalogIndex(self.products)
 
     def get_recommendations(self, timers_assessment: dict, resvech_score: int, parameters: dict) -> dict:
         """
         Filters products and identifies misalignments for transparency.
+        Cost scales with the number of matching products, not the catalog size.
         """
-        recommended = []
+        index = self.index
+        selected = set()
+
+        # 1. Check Alignment Rules
+        for key in index.timers:
+            selected |= index.timers_matches(key, timers_assessment.get(key, {}).get("status", ""))
+
+        # 2. Check Thresholds (Inclusion)
+        for rule, parameter in RESVECH_MIN_RULES.items():
+            if rule in index.min_rules:
+                selected.update(index.at_least(rule, parameters.get(parameter, 0)))
+
+        # 3. Check Exclusions (Rejection Logic)
+        rejections = {}
+        if "resvech_max_infection" in index.max_rules:
+            for position in index.exceeded("resvech_max_infection", parameters.get("infection_inflammation", 0)):
+                rejections.setdefault(position, []).append(
+                    f"Contrainduced: High Infection ({parameters.get('infection_inflammation')})")
+        if "resvech_max_slough" in index.max_rules:
+            for position in index.exceeded("resvech_max_slough", parameters.get("tissue_type", 0)):
+                rejections.setdefault(position, []).append(
+                    f"Contrainduced: Necrotic/Slough load too high ({parameters.get('tissue_type')})")
+
+        recommended = [self.products[position] for position in sorted(selected - rejections.keys())]
         misaligned = []
-        
-        for product in self.products:
-            is_recommended = False
-            rejection_reasons = []
-            rules = product["rules"]
-            
-            # 1. Check Alignment Rules
-            for key, triggers in rules.get("timers", {}).items():
-                current_status = timers_assessment.get(key, {}).get("status", "")
-                if any(t.lower() in current_status.lower() for t in triggers):
-                    is_recommended = True
-                elif key == "T" and "max_slough" in rules:
-                    # Specific check for exclusion
-                    pass
-            
-            # 2. Check Thresholds (Inclusion)
-            if "resvech_min_tissue" in rules and parameters.get("tissue_type", 0) >= rules["resvech_min_tissue"]:
-                is_recommended = True
-            if "resvech_min_infection" in rules and parameters.get("infection_inflammation", 0) >= rules["resvech_min_infection"]:
-                is_recommended = True
-            if "resvech_min_exudate" in rules and parameters.get("exudate", 0) >= rules["resvech_min_exudate"]:
-                is_recommended = True
-
-            # 3. Check Exclusions (Rejection Logic)
-            if "resvech_max_infection" in rules and parameters.get("infection_inflammation", 0) > rules["resvech_max_infection"]:
-                is_recommended = False
-                rejection_reasons.append(f"Contrainduced: High Infection ({parameters.get('infection_inflammation')})")
-            
-            if "resvech_max_slough" in rules and parameters.get("tissue_type", 0) > rules["resvech_max_slough"]:
-                is_recommended = False
-                rejection_reasons.append(f"Contrainduced: Necrotic/Slough load too high ({parameters.get('tissue_type')})")
-
-            if is_recommended:
-                recommended.append(product)
-            elif rejection_reasons:
-                misaligned_product = product.copy()
-                misaligned_product["rejection_reasons"] = rejection_reasons
-                misaligned.append(misaligned_product)
-                
+        for position in sorted(rejections):
+            misaligned_product = self.products[position].copy()
+            misaligned_product["rejection_reasons"] = rejections[position]
+            misaligned.append(misaligned_product)
+
         return {"recommended": recommended, "misaligned": misaligned}
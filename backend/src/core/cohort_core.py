@@ -0,0 +1,88 @@
+"""
+Phoenix Core - Scoring de cohortes
+Re-scoring vectorizado de RESVECH 2.0 / TIMERS sobre columnas (NumPy o DataFrame)
+para re-evaluar el histórico tras un cambio de guía clínica.
+"""
+
+from typing import Any, Dict, Mapping
+
+import numpy as np
+
+from .analyzer import (
+    BIOFILM_AGGRESSIVE_THRESHOLD, INFECTION_SUSPECTED_THRESHOLD, RESVECH_COMPONENTS, RESVECH_MAX_SCORE,
+    TIMERS_STATUS, WoundAnalyzer
+)
+
+# Description column -> classifier used for its TIMERS dimension
+TEXT_COLUMNS = {
+    "T": ("tissue_type_desc", "classify_tissue"),
+    "M": ("exudate_desc", "classify_moisture"),
+    "E": ("edges_desc", "classify_edges"),
+}
+
+
+class CohortScorer:
+    """
+    Columnar counterpart of WoundAnalyzer.calculate_resvech_score,
+    get_timers_assessment and get_biofilm_protocol.
+
+    Input: a mapping (dict of arrays, DataFrame) with the six RESVECH component
+    columns and the description columns (tissue_type_desc, exudate_desc,
+    edges_desc). Missing columns take the same defaults as the scalar path
+    (0 / ""). Description columns are treated as strings.
+
+    Output, one array per key, aligned with the input rows:
+    - score: raw RESVECH sum
+    - total: score capped at 35 (what calculate_resvech_score returns)
+    - timers_T / timers_I / timers_M / timers_E: status codes (index into TIMERS_STATUS)
+    - biofilm_aggressive: True where the aggressive biofilm protocol applies
+
+    Numeric rules are evaluated with array operations. Descriptions are
+    factorized with np.unique and each distinct text is classified once with
+    the scalar classifier, so results match the scalar path by construction.
+    """
+
+    def __init__(self, analyzer: WoundAnalyzer = None):
+        self.analyzer = analyzer or WoundAnalyzer()
+
+    def score(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        rows = self._row_count(columns)
+
+        score = np.zeros(rows, dtype=np.int64)
+        for component in RESVECH_COMPONENTS:
+            if component in columns:
+                score = score + np.asarray(columns[component])
+
+        infection = (np.asarray(columns["infection_inflammation"])
+                     if "infection_inflammation" in columns else np.zeros(rows, dtype=np.int64))
+
+        result = {
+            "score": score,
+            "total": np.minimum(score, RESVECH_MAX_SCORE),
+            "timers_I": (infection > INFECTION_SUSPECTED_THRESHOLD).astype(np.int8),
+            "biofilm_aggressive": infection >= BIOFILM_AGGRESSIVE_THRESHOLD,
+        }
+        for key, (column, classifier) in TEXT_COLUMNS.items():
+            result[f"timers_{key}"] = self._classify_text(columns, column, getattr(self.analyzer, classifier), rows)
+        return result
+
+    @staticmethod
+    def decode_timers(key: str, codes: np.ndarray) -> np.ndarray:
+        """Maps status codes of one TIMERS dimension back to their status strings."""
+        statuses = np.array([entry["status"] for entry in TIMERS_STATUS[key]], dtype=object)
+        return statuses[codes]
+
+    @staticmethod
+    def _classify_text(columns: Mapping[str, Any], column: str, classifier, rows: int) -> np.ndarray:
+        if column not in columns:
+            return np.full(rows, classifier(""), dtype=np.int8)
+        uniques, inverse = np.unique(np.asarray(columns[column]).astype(str), return_inverse=True)
+        codes = np.fromiter((classifier(text) for text in uniques), dtype=np.int8, count=len(uniques))
+        return codes[inverse.reshape(-1)]
+
+    @staticmethod
+    def _row_count(columns: Mapping[str, Any]) -> int:
+        for name in RESVECH_COMPONENTS + tuple(column for column, _ in TEXT_COLUMNS.values()):
+            if name in columns:
+                return len(columns[name])
+        raise ValueError("Cohort input has none of the RESVECH or TIMERS description columns")
@@ -0,0 +1,343 @@
+"""
+Phoenix Core - Histórico columnar
+Almacén append-only de eventos (uso de insumos, valoraciones) en columnas
+binarias de NumPy, particionadas por mes y leídas con memory-map.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: single-process locking only
+    fcntl = None
+
+# table -> column -> dtype. Columns listed in DICTIONARY_COLUMNS hold int32
+# codes into a per-table string dictionary; HASHED_COLUMNS hold a keyed
+# 64-bit hash instead, so identifiers (PHI) never reach the dictionary.
+# "ts" (UTC epoch seconds) is written last on every append and acts as the
+# commit marker for a row.
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "usage": {
+        "clinic": "<i4", "category": "<i4", "product": "<i4",
+        "units": "<i4", "unit_cost": "<f8", "ts": "<i8",
+    },
+    "assessments": {
+        "clinic": "<i4", "patient_hash": "<i8", "resvech_total": "<i2", "infection": "<f4",
+        "timers_T": "<i1", "timers_I": "<i1", "timers_M": "<i1", "timers_E": "<i1", "ts": "<i8",
+    },
+}
+DICTIONARY_COLUMNS = {"clinic", "category", "product"}
+HASHED_COLUMNS = {"patient_hash": "patient"}  # column -> input field
+# Secret key of the identifier hashes (16-64 bytes). Required: without it the
+# hashes of guessable patient IDs could simply be recomputed.
+HASH_KEY = os.getenv("PHOENIX_HISTORY_HASH_KEY", "").encode()
+HASH_KEY_MIN_BYTES = 16
+
+Timestamp = Union[datetime, str, int, float, None]
+
+
+class ColumnarHistoryStore:
+    """
+    Layout: <root>/<table>/<YYYY-MM>/<column>.bin, one raw little-endian
+    array per column and month, plus <root>/<table>/dictionary.json.
+    Appends hold an exclusive lock on <root>/<table>/.lock, so several
+    worker processes can share one store: the dictionary is re-read under
+    the lock before new codes are assigned, and rows stay aligned.
+
+    Queries prune partitions by month, memory-map only the columns they
+    need, and (for aggregate()) reduce one partition at a time. A multi-year
+    query therefore never holds the whole history in RAM.
+    """
+
+    def __init__(self, root: Optional[str] = None, hash_key: Optional[bytes] = None):
+        self.root = root or os.getenv("PHOENIX_HISTORY_DIR", "phoenix_history")
+        self.hash_key = HASH_KEY if hash_key is None else hash_key
+        if not HASH_KEY_MIN_BYTES <= len(self.hash_key) <= 64:
+            raise ValueError(
+                f"PHOENIX_HISTORY_HASH_KEY must be a secret of {HASH_KEY_MIN_BYTES}-64 bytes "
+                "(patient IDs are stored as keyed hashes)"
+            )
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._dictionary_stamps: Dict[str, Optional[tuple]] = {}  # (mtime_ns, size) when loaded
+        self._dictionaries_to_save = set()
+        self._checked_partitions = set()
+
+    # ---- writes -----------------------------------------------------------
+
+    def append(self, table: str, rows: Union[Dict[str, Any], Iterable[Dict[str, Any]]]) -> int:
+        """
+        Appends one row (dict) or many rows. String values of dictionary
+        columns are encoded, hashed columns are read from their input field
+        (e.g. "patient") and hashed; missing columns are stored as 0.
+        Returns the number of rows written.
+        """
+        schema = self._schema(table)
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        if not rows:
+            return 0
+
+        with self._lock, self._table_lock(table):
+            # Another process may have added codes since we last read the dictionary
+            self._reload_if_changed(table)
+            # Encode strings and persist the dictionary before any column data,
+            # so every code on disk can always be decoded.
+            by_partition: Dict[str, List[Dict[str, Any]]] = {}
+            dictionary_changed = False
+            for row in rows:
+                encoded = {"ts": _epoch_seconds(row.get("ts"))}
+                for column in schema:
+                    if column == "ts":
+                        continue
+                    if column in HASHED_COLUMNS:
+                        encoded[column] = hash_identifier(row.get(HASHED_COLUMNS[column]), self.hash_key)
+                        continue
+                    value = row.get(column)
+                    if column in DICTIONARY_COLUMNS:
+                        value, added = self._encode(table, column, value)
+                        dictionary_changed = dictionary_changed or added
+                    encoded[column] = 0 if value is None else value
+                by_partition.setdefault(_partition_name(encoded["ts"]), []).append(encoded)
+            if dictionary_changed or table in self._dictionaries_to_save:
+                self._save_dictionary(table)
+
+            for partition, partition_rows in by_partition.items():
+                directory = os.path.join(self.root, table, partition)
+                self._prepare_partition(table, directory)
+                for column, dtype in schema.items():  # "ts" is last in every schema
+                    values = np.asarray([row[column] for row in partition_rows], dtype=dtype)
+                    with open(os.path.join(directory, f"{column}.bin"), "ab") as f:
+                        f.write(values.tobytes())
+        return len(rows)
+
+    # ---- reads ------------------------------------------------------------
+
+    def scan(self, table: str, start: Timestamp, end: Timestamp, columns: List[str],
+             filters: Optional[Dict[str, str]] = None, decode: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Returns the requested columns for rows with start <= ts < end that
+        match every equality filter (e.g. {"clinic": "north"}). Only the
+        requested and filter columns are read.
+        """
+        schema = self._schema(table)
+        unknown = [column for column in columns if column not in schema]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {unknown}")
+
+        parts: Dict[str, List[np.ndarray]] = {column: [] for column in columns}
+        for directory, mask in self._matching_rows(table, start, end, filters):
+            for column in columns:
+                data = self._column(directory, column, schema[column], len(mask))
+                parts[column].append(np.array(data[mask]))
+
+        result = {
+            column: np.concatenate(chunks) if chunks else np.empty(0, dtype=schema[column])
+            for column, chunks in parts.items()
+        }
+        if decode:
+            for column in columns:
+                if column in DICTIONARY_COLUMNS:
+                    result[column] = self._decode(table, column, result[column])
+        return result
+
+    def aggregate(self, table: str, start: Timestamp, end: Timestamp, value: str, by: str,
+                  filters: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """
+        Sums `value` grouped by the dictionary column `by`, one partition at a
+        time (constant memory regardless of the time range).
+        """
+        schema = self._schema(table)
+        if by not in DICTIONARY_COLUMNS or by not in schema:
+            raise ValueError(f"'{by}' is not a groupable column of {table}")
+        if value not in schema or value in DICTIONARY_COLUMNS:
+            raise ValueError(f"'{value}' is not a numeric column of {table}")
+        totals = np.zeros(0, dtype=np.float64)
+        for directory, mask in self._matching_rows(table, start, end, filters):
+            codes = self._column(directory, by, schema[by], len(mask))[mask]
+            values = self._column(directory, value, schema[value], len(mask))[mask]
+            partial = np.bincount(codes, weights=values.astype(np.float64))
+            if len(partial) > len(totals):
+                totals = np.pad(totals, (0, len(partial) - len(totals)))
+            totals[:len(partial)] += partial
+        names = self._decode(table, by, np.arange(len(totals)))
+        return {name: float(total) for name, total in zip(names, totals) if total}
+
+    # ---- internals --------------------------------------------------------
+
+    def _matching_rows(self, table: str, start: Timestamp, end: Timestamp, filters: Optional[Dict[str, str]]):
+        """Yields (partition directory, row mask) for partitions overlapping [start, end)."""
+        schema = self._schema(table)
+        start_ts, end_ts = _epoch_seconds(start), _epoch_seconds(end)
+        first, last = _partition_name(start_ts), _partition_name(max(end_ts - 1, start_ts))
+
+        codes = {}
+        for column, wanted in (filters or {}).items():
+            if column in HASHED_COLUMNS and column in schema:
+                codes[column] = hash_identifier(wanted, self.hash_key)
+                continue
+            if column not in DICTIONARY_COLUMNS or column not in schema:
+                raise ValueError(f"Cannot filter {table} on '{column}'")
+            code = self._dictionary(table, column).get(wanted)
+            if code is None and self._reload_if_changed(table):
+                # Added by another worker process since we loaded it
+                code = self._dictionary(table, column).get(wanted)
+            if code is None:
+                return
+            codes[column] = code
+
+        table_dir = os.path.join(self.root, table)
+        if not os.path.isdir(table_dir):
+            return
+        for partition in sorted(os.listdir(table_dir)):
+            if not (first <= partition <= last) or not os.path.isdir(os.path.join(table_dir, partition)):
+                continue  # partition pruning
+            directory = os.path.join(table_dir, partition)
+            ts = self._column(directory, "ts", schema["ts"])
+            if not len(ts):
+                continue
+            mask = (ts >= start_ts) & (ts < end_ts)
+            for column, code in codes.items():
+                mask &= self._column(directory, column, schema[column], len(ts)) == code
+            if mask.any():
+                yield directory, mask
+
+    @staticmethod
+    def _column(directory: str, column: str, dtype: str, rows: Optional[int] = None) -> np.ndarray:
+        path = os.path.join(directory, f"{column}.bin")
+        itemsize = np.dtype(dtype).itemsize
+        available = os.path.getsize(path) // itemsize if os.path.exists(path) else 0
+        rows = available if rows is None else min(rows, available)
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+    def _prepare_partition(self, table: str, directory: str):
+        """
+        Creates the partition and, once per process, trims columns that
+        outgrew "ts" after an interrupted append so rows stay aligned.
+        """
+        if directory in self._checked_partitions:
+            return
+        os.makedirs(directory, exist_ok=True)
+        schema = self._schema(table)
+        rows = len(self._column(directory, "ts", schema["ts"]))
+        for column, dtype in schema.items():
+            path = os.path.join(directory, f"{column}.bin")
+            size = rows * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+        self._checked_partitions.add(directory)
+
+    def _schema(self, table: str) -> Dict[str, str]:
+        if table not in SCHEMAS:
+            raise ValueError(f"Unknown history table: {table}")
+        return SCHEMAS[table]
+
+    @contextmanager
+    def _table_lock(self, table: str):
+        directory = os.path.join(self.root, table)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _dictionary(self, table: str, column: str) -> Dict[str, int]:
+        if table not in self._dictionaries:
+            path = self._dictionary_path(table)
+            self._dictionary_stamps[table] = _file_stamp(path)
+            if os.path.exists(path):
+                with open(path) as f:
+                    stored = json.load(f)
+                # Drops columns that are no longer dictionary-encoded (patient IDs
+                # from older stores); the next append rewrites the file without them
+                self._dictionaries[table] = {name: codes for name, codes in stored.items()
+                                             if name in DICTIONARY_COLUMNS}
+                if len(self._dictionaries[table]) < len(stored):
+                    self._dictionaries_to_save.add(table)
+            else:
+                self._dictionaries[table] = {}
+        return self._dictionaries[table].setdefault(column, {})
+
+    def _reload_if_changed(self, table: str) -> bool:
+        if table in self._dictionaries and self._dictionary_stamps.get(table) == _file_stamp(self._dictionary_path(table)):
+            return False
+        self._dictionaries.pop(table, None)
+        return True
+
+    def _dictionary_path(self, table: str) -> str:
+        return os.path.join(self.root, table, "dictionary.json")
+
+    def _encode(self, table: str, column: str, value: Optional[str]):
+        dictionary = self._dictionary(table, column)
+        key = "" if value is None else str(value)
+        code = dictionary.get(key)
+        if code is None:
+            code = dictionary[key] = len(dictionary)
+            return code, True
+        return code, False
+
+    def _decode(self, table: str, column: str, codes: np.ndarray) -> np.ndarray:
+        if len(codes) and codes.max() >= len(self._dictionary(table, column)):
+            self._reload_if_changed(table)  # codes written by another worker process
+        names = np.empty(len(self._dictionary(table, column)), dtype=object)
+        for name, code in self._dictionary(table, column).items():
+            names[code] = name
+        return names[codes] if len(names) else np.empty(len(codes), dtype=object)
+
+    def _save_dictionary(self, table: str):
+        directory = os.path.join(self.root, table)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, "dictionary.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._dictionaries[table], f)
+        os.replace(tmp_path, self._dictionary_path(table))
+        self._dictionary_stamps[table] = _file_stamp(self._dictionary_path(table))
+        self._dictionaries_to_save.discard(table)
+
+
+def hash_identifier(value: Optional[str], key: bytes) -> int:
+    """
+    Keyed 64-bit BLAKE2b of an identifier (0 for missing). The key keeps the
+    hashes from being recomputed from guessable patient IDs.
+    """
+    if value is None or value == "":
+        return 0
+    digest = hashlib.blake2b(str(value).encode(), digest_size=8, key=key).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def _file_stamp(path: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _epoch_seconds(value: Timestamp) -> int:
+    if value is None:
+        return int(datetime.now(timezone.utc).timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def _partition_name(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m")
@@ -0,0 +1,131 @@
+"""
+Phoenix Core - Normalización de imágenes
+Decodifica la foto de la herida, aplica la orientación EXIF y la elimina,
+la reduce al tamaño que necesita Med-Gemma y la re-codifica, en un pool de
+procesos para no retener el GIL del event loop. Calcula además un hash
+perceptual para detectar fotos casi duplicadas.
+"""
+
+import asyncio
+import base64
+import binascii
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+IMAGE_MAX_SIDE = int(os.getenv("PHOENIX_IMAGE_MAX_SIDE", "1024"))
+IMAGE_QUALITY = int(os.getenv("PHOENIX_IMAGE_QUALITY", "85"))
+IMAGE_WORKERS = int(os.getenv("PHOENIX_IMAGE_WORKERS", "0")) or None  # None: one per CPU
+HASH_SIZE = 8  # 8x8 difference hash -> 64 bits
+
+
+class InvalidImage(ValueError):
+    """The photo sent by the client is not a decodable image (or not valid base64)."""
+
+
+def normalize_image(data: bytes, max_side: int = IMAGE_MAX_SIDE, quality: int = IMAGE_QUALITY) -> Dict[str, Any]:
+    """
+    Runs in a worker process (module-level so it pickles). Returns the
+    re-encoded JPEG (no EXIF, longest side <= max_side), its size and a
+    64-bit difference hash as 16 hex chars.
+    """
+    # Pillow is only needed in the worker processes, not at API import time
+    from PIL import Image, ImageOps
+
+    try:
+        original = Image.open(io.BytesIO(data))
+        original.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        # Unidentified/truncated data, or a decompression bomb: the client's fault
+        raise InvalidImage(f"Not a valid image ({type(e).__name__}: unrecognized, truncated or too large)") from e
+    with original:
+        # Rotate pixels per the EXIF Orientation tag; the saved JPEG carries no EXIF at all
+        image = ImageOps.exif_transpose(original)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+        return {
+            "image_bytes": output.getvalue(),
+            "width": image.width,
+            "height": image.height,
+            "original_bytes": len(data),
+            "phash": perceptual_hash(image),
+        }
+
+
+def perceptual_hash(image) -> str:
+    """Difference hash: brighter/darker between horizontal neighbours on a 9x8 grayscale thumbnail."""
+    from PIL import Image
+
+    pixels = list(image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS).getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (HASH_SIZE + 1) + col + 1])
+    return f"{bits:0{HASH_SIZE * HASH_SIZE // 4}x}"
+
+
+def hamming_distance(hash_a: str, hash_b: str) -> int:
+    """Number of differing bits; <= ~10 of 64 usually means the same wound photo."""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+def read_image_bytes(image) -> Optional[bytes]:
+    """Accepts raw bytes, a file handle or base64 (with or without a data: URL prefix)."""
+    if image is None:
+        return None
+    if hasattr(image, "read"):
+        image.seek(0)
+        data = image.read()
+        image.seek(0)
+        return data
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    if image.startswith("data:"):
+        image = image.partition(",")[2]
+    try:
+        return base64.b64decode(image)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidImage(f"Invalid base64 image: {e}")
+
+
+class ImageNormalizer:
+    """
+    Owns the process pool. Created lazily on first use and shut down with
+    the service.
+    """
+
+    def __init__(self, max_side: int = IMAGE_MAX_SIDE, quality: int = IMAGE_QUALITY, workers: Optional[int] = IMAGE_WORKERS):
+        self.max_side = max_side
+        self.quality = quality
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def normalize(self, image) -> Dict[str, Any]:
+        data = read_image_bytes(image)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), normalize_image, data, self.max_side, self.quality)
+
+    async def warm_up(self):
+        """Starts the pool and imports Pillow in a worker, so the first photo doesn't pay for it."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_pool(), _warm_worker)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            # Wait for the (idle) workers to exit: without it they can outlive the server process
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def _warm_worker():
+    import PIL.Image  # noqa: F401
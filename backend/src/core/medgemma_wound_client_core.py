@@ -5,9 +5,23 @@ Integración con el modelo médico especializado para análisis de heridas.
 
 import os
 import json
-import requests
+import logging
+import httpx
+import msgspec
 from typing import Dict, List, Any, Optional
 
+from services.resilience import get_upstream
+
+GATEWAY_TIMEOUT_S = float(os.getenv("DANIEL_GATEWAY_TIMEOUT", "10"))
+GATEWAY_MAX_CONNECTIONS = int(os.getenv("DANIEL_GATEWAY_MAX_CONNECTIONS", "100"))
+GATEWAY_MAX_KEEPALIVE = int(os.getenv("DANIEL_GATEWAY_MAX_KEEPALIVE", "20"))
+GATEWAY_PRECONNECT = os.getenv("DANIEL_GATEWAY_PRECONNECT", "true").lower() in ("1", "true", "yes")
+GATEWAY_PRECONNECT_TIMEOUT_S = float(os.getenv("DANIEL_GATEWAY_PRECONNECT_TIMEOUT", "2"))
+
+_MODEL_OUTPUT_DECODER = msgspec.json.Decoder()
+
+logger = logging.getLogger(__name__)
+
 class MedGemmaWoundClient:
     """
     Cliente para interactuar con Med-Gemma especializado en Cuidado de Heridas.
@@ -16,6 +30,8 @@ class MedGemmaWoundClient:
     def __init__(self, api_key: Optional[str] = None):
         self.gateway_url = os.getenv("DANIEL_GATEWAY_URL", "http://localhost:4000/v1/copilot/invoke")
         self.api_key = api_key or os.getenv("DANIEL_GATEWAY_KEY", "dev-gateway-key")
+        # Circuit breaker compartido: con el Gateway caído se responde con el fallback sin esperar el timeout
+        self.upstream = get_upstream("medgemma", timeout=GATEWAY_TIMEOUT_S)
     
     def analyze_wound(self, image_data: Optional[str], clinical_context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -58,16 +74,23 @@ class MedGemmaWoundClient:
         }}
         """
 
+    def _build_payload(self, prompt: str, has_image: bool, normalized_image: Optional[str] = None) -> Dict[str, Any]:
+        payload = {
+            "type": "wound_analysis",
+            "app": "phoenix_core",
+            "data": {
+                "prompt": prompt,
+                "has_image": has_image
+            }
+        }
+        if normalized_image:
+            # JPEG ya reducido y sin EXIF (ver image_pipeline), en base64
+            payload["data"]["image_base64"] = normalized_image
+        return payload
+
     def _query_model(self, prompt: str, has_image: bool) -> str:
         try:
-            payload = {
-                "type": "wound_analysis",
-                "app": "phoenix_core",
-                "data": {
-                    "prompt": prompt,
-                    "has_image": has_image
-                }
-            }
+            payload = self._build_payload(prompt, has_image)
             # Mock de llamada a Gateway si no hay URL real
             if "localhost" in self.gateway_url:
                  # Si estamos en dev local sin gateway, retornamos un mock inteligente o llamamos a Gemini directo si tuviéramos la librería
@@ -76,37 +99,136 @@ class MedGemmaWoundClient:
                  # para no bloquear el desarrollo, pero la estructura YA es la correcta.
                  pass
 
-            response = requests.post(
-                self.gateway_url,
-                json=payload,
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                timeout=10
-            )
-            response.raise_for_status()
-            
-            result = response.json()
+            # requests solo lo usa esta ruta síncrona: se importa al usarla (~80 ms de arranque)
+            import requests
+
+            def post():
+                response = requests.post(
+                    self.gateway_url,
+                    json=payload,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    timeout=GATEWAY_TIMEOUT_S
+                )
+                response.raise_for_status()
+                return response
+
+            result = self.upstream.call_sync(post, operation="analyze_wound").json()
             return result.get("ai_analysis", "{}")
             
         except Exception as e:
-            print(f"Warning: Fallo al contactar Gateway ({e}). Usando fallback local para desarrollo.")
-            # Fallback temporal para permitir pruebas sin Gateway levantado
-            return json.dumps({
-                "parameters": {
-                    "tissue_type_desc": "Tejido de granulación con esfacelo parcial",
-                    "infection_inflammation": 2,
-                    "exudate_desc": "Moderado seroso",
-                    "edges_desc": "Irregulares pero viables",
-                    "size": 15,
-                    "depth": 1
-                },
-                "risk_analysis": "Riesgo moderado de infección local.",
-                "recommended_action": "Desbridamiento autolítico y control de humedad."
-            })
+            logger.warning("Fallo al contactar Gateway (%s). Usando fallback local para desarrollo.", e)
+            return self._fallback_response()
+
+    def _fallback_response(self) -> str:
+        # Fallback temporal para permitir pruebas sin Gateway levantado
+        return json.dumps({
+            "parameters": {
+                "tissue_type_desc": "Tejido de granulación con esfacelo parcial",
+                "infection_inflammation": 2,
+                "exudate_desc": "Moderado seroso",
+                "edges_desc": "Irregulares pero viables",
+                "size": 15,
+                "depth": 1
+            },
+            "risk_analysis": "Riesgo moderado de infección local.",
+            "recommended_action": "Desbridamiento autolítico y control de humedad.",
+            "fallback": True  # Marca para no cachear resultados que no vienen del modelo
+        })
 
     def _parse_response(self, response_str: str) -> Dict[str, Any]:
+        if isinstance(response_str, dict):
+            # El Gateway ya entregó el análisis como objeto JSON
+            return response_str
         try:
             clean_str = response_str.strip()
             if clean_str.startswith("```json"): clean_str = clean_str[7:-3]
-            return json.loads(clean_str)
-        except:
+            try:
+                # Ruta rápida: decodificador msgspec (estricto, sin objetos intermedios)
+                return _MODEL_OUTPUT_DECODER.decode(clean_str)
+            except msgspec.DecodeError:
+                # json de la stdlib acepta extensiones como NaN/Infinity
+                return json.loads(clean_str)
+        except (ValueError, AttributeError) as e:
+            logger.warning("Salida de Med-Gemma no interpretable (%s)", e)
             return {}
+
+
+class AsyncMedGemmaWoundClient(MedGemmaWoundClient):
+    """
+    Variante asíncrona del cliente Med-Gemma.
+    Usa un único httpx.AsyncClient con pool de conexiones (keep-alive) que vive
+    durante toda la vida de la app: se abre en el startup y se cierra en el shutdown,
+    de modo que las peticiones al Gateway no bloquean el event loop ni pagan un
+    handshake TCP/TLS por análisis.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(api_key)
+        self._http_client = http_client
+        self._owns_client = http_client is None
+
+    async def start(self) -> httpx.AsyncClient:
+        """Crea el pool de conexiones (idempotente)."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=GATEWAY_TIMEOUT_S,
+                limits=httpx.Limits(
+                    max_connections=GATEWAY_MAX_CONNECTIONS,
+                    max_keepalive_connections=GATEWAY_MAX_KEEPALIVE
+                )
+            )
+            self._owns_client = True
+        return self._http_client
+
+    async def preconnect(self, timeout: float = GATEWAY_PRECONNECT_TIMEOUT_S) -> bool:
+        """
+        Abre una conexión keep-alive con el Gateway durante el warm-up (HEAD,
+        sin inferencia), para que la primera petición no pague DNS + TCP/TLS.
+        """
+        client = await self.start()
+        try:
+            await client.request("HEAD", self.gateway_url, timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning("No se pudo pre-conectar al Gateway (%s).", e)
+            return False
+
+    async def aclose(self):
+        """Cierra el pool si fue creado por este cliente."""
+        if self._http_client is not None and self._owns_client:
+            await self._http_client.aclose()
+        self._http_client = None
+
+    async def analyze_wound_async(self, image_data: Optional[str], clinical_context: Dict[str, Any],
+                                  normalized_image: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Igual que analyze_wound, pero esperando al Gateway sin bloquear el event loop.
+        normalized_image: JPEG normalizado en base64 que se envía al Gateway.
+        """
+        prompt = self._build_wound_prompt(clinical_context)
+        has_image = bool(image_data)
+
+        response = await self._query_model_async(prompt, has_image, normalized_image)
+        return self._parse_response(response)
+
+    async def _query_model_async(self, prompt: str, has_image: bool, normalized_image: Optional[str] = None) -> str:
+        try:
+            client = await self.start()
+
+            async def post():
+                response = await client.post(
+                    self.gateway_url,
+                    json=self._build_payload(prompt, has_image, normalized_image),
+                    headers={"Authorization": f"Bearer {self.api_key}"}
+                )
+                response.raise_for_status()
+                return response
+
+            # Sin hedging: cada inferencia es costosa para el Gateway
+            response = await self.upstream.call(post, operation="analyze_wound")
+            result = response.json()
+            return result.get("ai_analysis", "{}")
+
+        except Exception as e:
+            logger.warning("Fallo al contactar Gateway (%s). Usando fallback local para desarrollo.", e)
+            return self._fallback_response()
@@ -1,6 +1,21 @@
-from .analyzer import WoundAnalyzer
+import asyncio
+import base64
+from contextlib import nullcontext
+
+from .analyzer import TIMERS_STATUS, WoundAnalyzer
 from .catalog import CatalogManager
 from .stats import StatisticsService
+from .medgemma_wound_client import GATEWAY_PRECONNECT, AsyncMedGemmaWoundClient
+from .result_cache import AnalysisResultCache
+from .single_flight import SingleFlight
+from .image_pipeline import ImageNormalizer, InvalidImage, read_image_bytes
+from .schemas import AnalysisResponse, AnalysisSummary, AstraMetadata, TimersEntry
+
+# TIMERS status string -> status code, per dimension
+TIMERS_CODES = {
+    key: {entry["status"]: code for code, entry in enumerate(entries)}
+    for key, entries in TIMERS_STATUS.items()
+}
 
 class PhoenixService:
     """
@@ -12,22 +27,76 @@ class PhoenixService:
         self.analyzer = WoundAnalyzer()
         self.catalog = CatalogManager()
         self.stats = StatisticsService()
+        # Long-lived Med-Gemma client: its connection pool is opened in startup()
+        # and shared by every analysis instead of one TCP/TLS session per request.
+        self.medgemma = AsyncMedGemmaWoundClient()
+        self.result_cache = AnalysisResultCache()
+        self.in_flight = SingleFlight()
+        self.image_normalizer = ImageNormalizer()
+
+    async def startup(self, report=None):
+        """
+        Controlled warm-up: pays up front for what the first analysis would
+        otherwise pay (gateway pool and connection, image worker processes).
+        Each step is recorded as a phase of the StartupReport when given.
+        """
+        def phase(name):
+            return report.phase(name) if report is not None else nullcontext()
+
+        with phase("medgemma_client"):
+            await self.medgemma.start()
+        if GATEWAY_PRECONNECT:
+            with phase("gateway_preconnect"):
+                await self.medgemma.preconnect()
+        with phase("image_worker_pool"):
+            await self.image_normalizer.warm_up()
+
+    async def shutdown(self):
+        await self.medgemma.aclose()
+        self.image_normalizer.shutdown()
+        self.stats.close()
+
+    def get_supply_stats(self, quarter=None):
+        return self.stats.get_quarterly_supply_usage(quarter)
+
+    def record_supply_usage(self, event: dict) -> int:
+        return self.stats.record_usage(
+            product_id=event.get("product_id"),
+            category=event.get("category"),
+            units=event.get("units", 1),
+            unit_cost=event.get("unit_cost"),
+            clinic_id=event.get("clinic_id"),
+            occurred_at=event.get("occurred_at")
+        )
+
+    def get_cache_stats(self):
+        return {**self.result_cache.stats(), "single_flight": self.in_flight.stats()}
         
-        return self.stats.get_quarterly_supply_usage()
-        
-    def analyze_wound_image(self, data: dict):
+    async def analyze_wound_image(self, data: dict, image=None):
         """
          Clinical Inference -> ROUTE TO MED-GEMMA (Real)
+         `image` is an optional file handle (streamed upload); without it the
+         photo is read from data["image_base64"]. Raises InvalidImage when the
+         photo can't be decoded.
         """
-        from .medgemma_wound_client import MedGemmaWoundClient
-        
-        client = MedGemmaWoundClient()
-        
-        # 1. Obtener análisis clínico de Med-Gemma
-        ai_result = client.analyze_wound(
-            image_data=data.get("image_base64"), 
-            clinical_context={"patient_id": data.get("patient_id"), "notes": data.get("notes")}
-        )
+        clinical_context = {"patient_id": data.get("patient_id"), "notes": data.get("notes")}
+        image_data = image if image is not None else data.get("image_base64")
+
+        # 1. Obtener análisis clínico de Med-Gemma (sin bloquear el event loop).
+        # Re-envíos de la misma foto y contexto se sirven desde el caché, y
+        # peticiones idénticas simultáneas comparten una sola llamada al Gateway.
+        if image_data:
+            # Reading/decoding the photo (up to the upload cap) and hashing it run in a
+            # thread; the bytes are reused for the image workers
+            image_data, cache_key = await asyncio.to_thread(self._read_image_and_key, image_data, clinical_context)
+        else:
+            cache_key = self.result_cache.make_key(None, clinical_context)
+        ai_result = await self.result_cache.get_async(cache_key)
+        if ai_result is None:
+            ai_result = await self.in_flight.do(
+                cache_key,
+                lambda: self._query_medgemma(cache_key, image_data, clinical_context)
+            )
         
         # 2. Extraer parámetros normalizados
         parameters = ai_result.get("parameters", {
@@ -43,20 +112,67 @@ class PhoenixService:
         biofilm_protocol = self.analyzer.get_biofilm_protocol(parameters.get("infection_inflammation", 0))
         product_results = self.catalog.get_recommendations(timers_assessment, resvech_score, parameters)
 
-        return {
-            "model_used": "Med-Gemma-2b (Wound-Tuned)",
-            "resvech_score": resvech_score,
-            "timers": timers_assessment,
-            "biofilm_protocol": biofilm_protocol,
-            "sponsored_products": product_results["recommended"],
-            "misaligned_products": product_results["misaligned"],
-            "analysis": {
-                "tissue_type": parameters.get("tissue_type_desc", "Unknown"),
-                "infection_risk": ai_result.get("risk_analysis", "Pending Evaluation"),
-                "suggested_protocol": ai_result.get("recommended_action", "Standard Care")
-            },
-            "astra_metadata": {
-                "latency_ms": "Dynamic",
-                "source": data.get("source", "Standard_Upload")
-            }
-        }
+        if self.stats.history_store is not None:
+            self.stats.record_assessment(
+                patient_id=data.get("patient_id"),
+                clinic_id=data.get("clinic_id"),
+                resvech_total=resvech_score,
+                infection=parameters.get("infection_inflammation", 0),
+                timers_codes={key: TIMERS_CODES[key][entry["status"]] for key, entry in timers_assessment.items()}
+            )
+
+        # Typed response: serialized by FastJSONResponse / encode_json in one pass
+        return AnalysisResponse(
+            model_used="Med-Gemma-2b (Wound-Tuned)",
+            resvech_score=resvech_score,
+            timers={key: TimersEntry(entry["status"], entry["action"]) for key, entry in timers_assessment.items()},
+            biofilm_protocol=biofilm_protocol,
+            sponsored_products=product_results["recommended"],
+            misaligned_products=product_results["misaligned"],
+            analysis=AnalysisSummary(
+                tissue_type=parameters.get("tissue_type_desc", "Unknown"),
+                infection_risk=ai_result.get("risk_analysis", "Pending Evaluation"),
+                suggested_protocol=ai_result.get("recommended_action", "Standard Care")
+            ),
+            astra_metadata=AstraMetadata(
+                latency_ms="Dynamic",
+                source=data.get("source", "Standard_Upload"),
+                image=ai_result.get("image_metadata")
+            )
+        )
+
+    def _read_image_and_key(self, image, clinical_context: dict):
+        image_bytes = read_image_bytes(image)
+        if not image_bytes:
+            raise InvalidImage("Empty image")
+        return image_bytes, self.result_cache.make_key(image_bytes, clinical_context)
+
+    async def _query_medgemma(self, cache_key: str, image_data, clinical_context: dict) -> dict:
+        # Reducir la foto (12 MP en tablets) en el pool de procesos antes de enviarla
+        normalized_image, image_metadata = None, None
+        image_lost = False
+        if image_data:
+            try:
+                normalized = await self.image_normalizer.normalize(image_data)
+                image_bytes = normalized.pop("image_bytes")
+                normalized_image = base64.b64encode(image_bytes).decode()
+                image_metadata = {**normalized, "normalized_bytes": len(image_bytes)}
+            except InvalidImage:
+                raise  # the client's photo: a 400, never an analysis without it
+            except Exception as e:
+                # Our side failed (e.g. a crashed worker): degrade, but see the cache below
+                print(f"Warning: No se pudo normalizar la imagen ({e}). Se analiza sin imagen.")
+                image_lost = True
+
+        ai_result = await self.medgemma.analyze_wound_async(
+            image_data=image_data,
+            clinical_context=clinical_context,
+            normalized_image=normalized_image
+        )
+        if ai_result and image_metadata:
+            # Cached together with the model output, so hits report the same hash
+            ai_result["image_metadata"] = image_metadata
+        # The key covers the photo: a result produced without it must not answer for it
+        if ai_result and not ai_result.get("fallback") and not image_lost:
+            await self.result_cache.set_async(cache_key, ai_result)
+        return ai_result
@@ -0,0 +1,204 @@
+"""
+Phoenix Core - Caché de resultados Med-Gemma
+Caché direccionado por contenido (imagen + contexto clínico) para no repetir
+el round trip al Gateway cuando un clínico re-envía la misma foto.
+"""
+
+import asyncio
+import binascii
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .image_pipeline import read_image_bytes
+
+HASH_CHUNK_BYTES = 64 * 1024
+# Expired rows are deleted at most this often, not on every write
+DISK_PURGE_INTERVAL_S = float(os.getenv("PHOENIX_CACHE_PURGE_INTERVAL", "300"))
+
+
+class AnalysisResultCache:
+    """
+    Two-tier cache for raw Med-Gemma output:
+    - In-memory LRU bounded by max_entries, with TTL.
+    - Optional SQLite file (PHOENIX_CACHE_PATH) that survives restarts.
+
+    From async code use get_async()/set_async(): memory hits are answered
+    inline and SQLite is only touched from a worker thread.
+
+    Only the parsed model output is stored. RESVECH/TIMERS/catalog
+    post-processing is re-run on every hit so catalog changes take effect.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 disk_path: Optional[str] = None):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("PHOENIX_CACHE_MAX_ENTRIES", "1024"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("PHOENIX_CACHE_TTL", "3600"))
+        self.disk_path = disk_path or os.getenv("PHOENIX_CACHE_PATH")
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at_monotonic, value)
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_lock = threading.Lock()  # the SQLite connection, kept apart from the LRU
+        self._next_purge = 0.0
+        if self.disk_path:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS analysis_cache_expires_at ON analysis_cache (expires_at)")
+            self._disk.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(image_base64: Optional[str], clinical_context: Dict[str, Any]) -> str:
+        """
+        SHA-256 over the image payload plus the normalized clinical context.
+        Whitespace in strings is collapsed and None values are dropped, so
+        cosmetic differences between devices map to the same key.
+        The image may also be raw bytes or an uploaded file handle. Either way
+        the decoded image bytes are hashed, so the same photo gets the same key
+        whether it was uploaded as a file or sent as base64 (handles are hashed
+        in chunks and rewound afterwards). Hashing a full-size photo takes
+        milliseconds: async callers run this in a worker thread.
+        """
+        digest = hashlib.sha256()
+        if hasattr(image_base64, "read"):
+            digest.update(b"image\x00")
+            image_base64.seek(0)
+            for chunk in iter(lambda: image_base64.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+            image_base64.seek(0)
+        elif image_base64:
+            try:
+                image_bytes = read_image_bytes(image_base64)
+            except (binascii.Error, ValueError):
+                image_bytes = None
+            if image_bytes is not None:
+                digest.update(b"image\x00")
+                digest.update(image_bytes)
+            else:
+                # Not valid base64: key on the text itself
+                digest.update(image_base64.encode())
+        digest.update(b"\x00")
+        digest.update(json.dumps(_normalize_context(clinical_context), sort_keys=True, separators=(",", ":")).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._get_memory(key)
+        if value is None and self._disk is not None:
+            value = self._get_disk(key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    async def get_async(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._get_memory(key)
+        if value is None and self._disk is not None:
+            value = await asyncio.to_thread(self._get_disk, key)
+        if value is None:
+            self._count_miss()
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._remember(key, value, time.monotonic() + self.ttl_seconds)
+        if self._disk is not None:
+            self._set_disk(key, value)
+
+    async def set_async(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._remember(key, value, time.monotonic() + self.ttl_seconds)
+        if self._disk is not None:
+            await asyncio.to_thread(self._set_disk, key, value)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM analysis_cache")
+                self._disk.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._disk is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT expires_at, value FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+        remaining = row[0] - time.time() if row is not None else 0
+        if remaining <= 0:
+            return None
+        value = json.loads(row[1])
+        with self._lock:
+            self._remember(key, value, time.monotonic() + remaining)
+            self.disk_hits += 1
+        return value
+
+    def _set_disk(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        with self._disk_lock:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, now + self.ttl_seconds, json.dumps(value, separators=(",", ":")))
+            )
+            if now >= self._next_purge:
+                self._disk.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (now,))
+                self._next_purge = now + DISK_PURGE_INTERVAL_S
+            self._disk.commit()
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def _normalize_context(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _normalize_context(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_context(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
@@ -0,0 +1,90 @@
+"""
+Phoenix Core - Modelos de respuesta
+Structs tipados (msgspec) para las respuestas de análisis, estadísticas y
+propuestas, y una respuesta JSON que los serializa sin pasar por
+jsonable_encoder ni por el json de la stdlib.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+
+import msgspec
+from starlette.responses import Response
+
+Number = Union[int, float]
+
+
+class TimersEntry(msgspec.Struct):
+    status: str
+    action: str
+
+
+class AnalysisSummary(msgspec.Struct):
+    tissue_type: Any
+    infection_risk: Any
+    suggested_protocol: Any
+
+
+class AstraMetadata(msgspec.Struct):
+    latency_ms: str
+    source: Any
+    image: Optional[Dict[str, Any]] = None
+
+
+class AnalysisResponse(msgspec.Struct):
+    """Response of /api/analyze_wound (field order = JSON key order)."""
+    model_used: str
+    resvech_score: Number
+    timers: Dict[str, TimersEntry]
+    biofilm_protocol: List[str]
+    # Catalog entries are passed through as-is: converting every product on
+    # every response would cost more than it saves
+    sponsored_products: List[Dict[str, Any]]
+    misaligned_products: List[Dict[str, Any]]
+    analysis: AnalysisSummary
+    astra_metadata: AstraMetadata
+
+
+class CategoryUsage(msgspec.Struct, frozen=True):
+    name: str
+    usage: int
+    trend: str
+
+
+class SupplyUsageSummary(msgspec.Struct, frozen=True):
+    """Quarterly dashboard view; frozen because it is memoized and shared."""
+    period: str
+    total_units: int
+    cost_efficiency: str
+    categories: List[CategoryUsage]
+    monthly_breakdown: Dict[str, int]
+
+
+class ProposalResponse(msgspec.Struct, omit_defaults=True):
+    success: bool
+    proposal_text: Optional[str] = None
+    metadata: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+    fallback_msg: Optional[str] = None
+
+
+def _enc_hook(obj: Any) -> Any:
+    # NumPy scalars (history/cohort results) -> Python numbers; anything else as text
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+_ENCODER = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def encode_json(content: Any) -> bytes:
+    """Structs, dicts and lists to compact UTF-8 JSON."""
+    return _ENCODER.encode(content)
+
+
+class FastJSONResponse(Response):
+    """JSONResponse counterpart for Structs and plain dicts. Return it directly from routes."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
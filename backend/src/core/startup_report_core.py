@@ -0,0 +1,153 @@
+"""
+Phoenix Core - Informe de arranque
+Mide el tiempo de importación de cada módulo y las fases de warm-up hasta
+que la app está lista para servir (cold starts en Cloud Run).
+"""
+
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+STARTUP_REPORT_PRINT = os.getenv("PHOENIX_STARTUP_REPORT", "false").lower() in ("1", "true", "yes")
+STARTUP_REPORT_TOP = int(os.getenv("PHOENIX_STARTUP_REPORT_TOP", "15"))
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, recorder: "ImportTimer"):
+        self._loader = loader
+        self._recorder = recorder
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._recorder._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._recorder._exit(module.__name__, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        # get_resource_reader, is_package, ... used by importlib.resources etc.
+        return getattr(self._loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Meta path hook that times every module executed while installed.
+    Records cumulative time (including nested imports) and self time,
+    like `python -X importtime`, but available at runtime.
+    """
+
+    def __init__(self):
+        self.modules: Dict[str, Dict[str, float]] = {}
+        self.total_s = 0.0  # imports not nested in another timed import
+        self._local = threading.local()  # per-thread stack of nested import times
+        self._finding = set()
+        self._loaders = {}
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        # Give the timed modules their real loaders back (isinstance checks, reloads)
+        for name, loader in self._loaders.items():
+            module = sys.modules.get(name)
+            if module is None:
+                continue
+            if getattr(module, "__spec__", None) is not None and isinstance(module.__spec__.loader, _TimedLoader):
+                module.__spec__.loader = loader
+            if isinstance(getattr(module, "__loader__", None), _TimedLoader):
+                module.__loader__ = loader
+        self._loaders.clear()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        self._loaders[fullname] = spec.loader
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._finding.discard(fullname)
+
+    def _stack(self) -> List[float]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter(self):
+        self._stack().append(0.0)
+
+    def _exit(self, name: str, cumulative: float):
+        stack = self._stack()
+        nested = stack.pop()
+        if stack:
+            stack[-1] += cumulative
+        else:
+            self.total_s += cumulative
+        self.modules[name] = {"cumulative_s": cumulative, "self_s": cumulative - nested}
+
+
+class StartupReport:
+    """
+    Collects import times (via ImportTimer) and named startup phases.
+    Created as early as possible in main; mark_ready() closes the report.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = ImportTimer().install()
+        self.phases: List[Dict[str, Any]] = []
+        self.ready_s = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"phase": name, "seconds": time.perf_counter() - started})
+
+    def mark_ready(self):
+        self.ready_s = time.perf_counter() - self.started
+        self.imports.uninstall()
+        if STARTUP_REPORT_PRINT:
+            self.print()
+
+    def as_dict(self, top: int = STARTUP_REPORT_TOP) -> Dict[str, Any]:
+        slowest = sorted(self.imports.modules.items(), key=lambda item: item[1]["cumulative_s"], reverse=True)
+        return {
+            "time_to_ready_s": self.ready_s,
+            "imports_total_s": self.imports.total_s,
+            "modules_imported": len(self.imports.modules),
+            "phases": self.phases,
+            "slowest_imports": [{"module": name, **timing} for name, timing in slowest[:top]],
+        }
+
+    def print(self, top: int = STARTUP_REPORT_TOP):
+        report = self.as_dict(top)
+        print(f"[Startup] Ready in {report['time_to_ready_s']:.3f}s "
+              f"({report['modules_imported']} modules imported, {report['imports_total_s']:.3f}s in top-level imports)")
+        for phase in report["phases"]:
+            print(f"[Startup]   phase {phase['phase']:<28} {phase['seconds'] * 1000:8.1f} ms")
+        for entry in report["slowest_imports"]:
+            print(f"[Startup]   import {entry['module']:<40} {entry['cumulative_s'] * 1000:8.1f} ms "
+                  f"(self {entry['self_s'] * 1000:.1f} ms)")
@@ -0,0 +1,137 @@
+"""
+Phoenix Core - Manifiesto de assets estáticos
+Carga en memoria el build del frontend al arrancar, con variantes gzip/brotli
+precalculadas y ETags fuertes, para servir la SPA sin tocar el disco.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Optional
+
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional: without it only gzip variants are built
+    brotli = None
+
+STATIC_DIR = os.getenv("PHOENIX_STATIC_DIR", "static")
+COMPRESS_MIN_BYTES = int(os.getenv("PHOENIX_STATIC_COMPRESS_MIN_BYTES", "1024"))
+IMMUTABLE_PREFIX = "assets/"  # Vite emits content-hashed file names here
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/manifest+json",
+    "application/xml", "image/svg+xml", "application/wasm",
+)
+ENCODINGS = ("br", "gzip")
+
+
+class StaticAsset:
+    def __init__(self, path: str, body: bytes):
+        self.path = path
+        self.content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if self.content_type.startswith("text/") or self.content_type == "application/javascript":
+            self.content_type += "; charset=utf-8"
+        self.cache_control = IMMUTABLE_CACHE if path.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # encoding -> (body, strong ETag); every representation has its own tag
+        self.variants: Dict[str, tuple] = {"identity": (body, f'"{digest}"')}
+        if len(body) >= COMPRESS_MIN_BYTES and self.content_type.startswith(COMPRESSIBLE_TYPES):
+            self._add_variant("gzip", gzip.compress(body, compresslevel=9, mtime=0), digest)
+            if brotli is not None:
+                self._add_variant("br", brotli.compress(body, quality=11), digest)
+
+    def _add_variant(self, encoding: str, compressed: bytes, digest: str):
+        # Only keep a variant that actually saves bytes
+        if len(compressed) < len(self.variants["identity"][0]):
+            self.variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+
+    def etags(self):
+        return {etag for _, etag in self.variants.values()}
+
+
+class StaticAssetManifest:
+    """
+    path -> StaticAsset for every file of the frontend build, loaded once.
+    respond() picks the best precompressed variant for Accept-Encoding and
+    answers conditional requests with 304, so serving the SPA costs no
+    filesystem calls and hashed bundles are cached by browsers for a year.
+    """
+
+    def __init__(self):
+        self.assets: Dict[str, StaticAsset] = {}
+        self.index: Optional[StaticAsset] = None
+        self.loaded = False
+
+    def load(self, root: str = STATIC_DIR) -> "StaticAssetManifest":
+        assets = {}
+        for directory, _, files in os.walk(root):
+            for name in files:
+                full_path = os.path.join(directory, name)
+                path = os.path.relpath(full_path, root).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    assets[path] = StaticAsset(path, f.read())
+        self.assets, self.index = assets, assets.get("index.html")
+        self.loaded = True
+        return self
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        return self.assets.get(path.lstrip("/"))
+
+    def stats(self) -> dict:
+        identity = sum(len(asset.variants["identity"][0]) for asset in self.assets.values())
+        smallest = sum(min(len(body) for body, _ in asset.variants.values()) for asset in self.assets.values())
+        return {"files": len(self.assets), "identity_bytes": identity, "smallest_bytes": smallest,
+                "brotli": brotli is not None}
+
+    @staticmethod
+    def respond(asset: StaticAsset, headers) -> Response:
+        encoding = _negotiate(asset, headers.get("accept-encoding", ""))
+        body, etag = asset.variants[encoding]
+        response_headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or _etag_matches(if_none_match, asset.etags())):
+            return Response(status_code=304, headers=response_headers)
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        return Response(body, media_type=asset.content_type, headers=response_headers)
+
+
+def _negotiate(asset: StaticAsset, accept_encoding: str) -> str:
+    """Highest-q available encoding; ties go to ENCODINGS order (br first)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    best, best_quality = "identity", 0.0
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality and encoding in asset.variants:
+            best, best_quality = encoding, quality
+    # Uncompressed only wins when the client asks for it with a higher q
+    if accepted.get("identity", accepted.get("*", 0.0)) > best_quality:
+        return "identity"
+    return best
+
+
+def _etag_matches(if_none_match: str, etags) -> bool:
+    # If-None-Match uses weak comparison: ignore a W/ prefix
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
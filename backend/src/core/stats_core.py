@@ -1,31 +1,87 @@
-import random
-from datetime import datetime, timedelta
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .usage_store import SupplyUsageStore, normalize_usage_event
 
 class StatisticsService:
     """
     Generates clinical analytics and supply usage statistics.
-    Simulates database aggregation for dashboard reporting.
+    Usage events are recorded in SupplyUsageStore, which keeps the dashboard
+    aggregates materialized so reads do not depend on history size.
+    When PHOENIX_HISTORY_DIR is set (PHOENIX_HISTORY_HASH_KEY is then required)
+    or a history_store is passed, usage and assessment events are also appended to the columnar history for ad-hoc
+    analytics. Assessment rows are written by a background thread, best
+    effort: the analysis response never waits for (or fails on) the history.
     """
-    
-    def get_quarterly_supply_usage(self):
-        """
-        Returns aggregated usage of dressings/products for the last 3 months.
-        """
-        # Simulated data - In production this would query a transaction DB
-        return {
-            "period": "Q4 2025 (Last Quarter)",
-            "total_units": 1245,
-            "cost_efficiency": "+12%",
-            "categories": [
-                {"name": "Foam Dressings (Allevyn)", "usage": 450, "trend": "up"},
-                {"name": "Antimicrobials (Acticoat)", "usage": 320, "trend": "steady"},
-                {"name": "Hydrosurgery Kits (Versajet)", "usage": 85, "trend": "up"},
-                {"name": "Hydrocolloids", "usage": 210, "trend": "down"},
-                {"name": "Negative Pressure (PICO)", "usage": 180, "trend": "up"}
-            ],
-            "monthly_breakdown": {
-                "Oct": 380,
-                "Nov": 410,
-                "Dec": 455
-            }
+
+    def __init__(self, usage_store: Optional[SupplyUsageStore] = None, history_store=None):
+        self.usage_store = usage_store or SupplyUsageStore()
+        if history_store is None and os.getenv("PHOENIX_HISTORY_DIR"):
+            from .history_store import ColumnarHistoryStore
+            history_store = ColumnarHistoryStore()
+        self.history_store = history_store
+        self._history_writer: Optional[ThreadPoolExecutor] = None
+
+    def record_usage(self, product_id: str, category: str, units: int, unit_cost: Optional[float] = None,
+                     clinic_id: Optional[str] = None, occurred_at=None) -> int:
+        """
+        Records a dressing/product usage event and updates the quarterly aggregates.
+        Raises ValueError for missing or malformed fields.
+        """
+        product_id, category, units, unit_cost, clinic_id = normalize_usage_event(
+            product_id, category, units, unit_cost, clinic_id)
+        event_id = self.usage_store.record_usage(product_id, category, units, unit_cost, clinic_id, occurred_at)
+        if self.history_store is not None:
+            self.history_store.append("usage", {
+                "ts": occurred_at, "clinic": clinic_id, "category": category, "product": product_id,
+                "units": units, "unit_cost": unit_cost
+            })
+        return event_id
+
+    def record_assessment(self, patient_id: Optional[str], clinic_id: Optional[str], resvech_total: int,
+                          infection: float, timers_codes: dict, occurred_at=None):
+        """
+        Queues a wound assessment for the columnar history (no-op when disabled).
+        Safe to call from the event loop: the file I/O runs on the writer thread.
+        timers_codes are the TIMERS_STATUS indexes per dimension.
+        """
+        if self.history_store is None:
+            return
+        if self._history_writer is None:
+            # One thread keeps rows in submission order
+            self._history_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-writer")
+        row = {
+            "ts": occurred_at, "clinic": clinic_id, "patient": patient_id,
+            "resvech_total": resvech_total, "infection": infection,
+            **{f"timers_{key}": code for key, code in timers_codes.items()}
         }
+        self._history_writer.submit(self._append_best_effort, "assessments", row)
+
+    def close(self):
+        """Waits for queued history writes."""
+        if self._history_writer is not None:
+            self._history_writer.shutdown(wait=True)
+            self._history_writer = None
+
+    def _append_best_effort(self, table: str, row: dict):
+        try:
+            self.history_store.append(table, row)
+        except Exception as e:
+            print(f"[History] Warning: could not append to {table}: {e}")
+
+    def query_history(self, table: str, start, end, value: str, by: str, filters: Optional[dict] = None) -> dict:
+        """
+        Sums `value` grouped by `by` over [start, end) in the columnar history,
+        e.g. query_history("usage", "2023-01-01", "2026-01-01", "units", "category", {"clinic": "north"}).
+        """
+        if self.history_store is None:
+            raise ValueError("Columnar history is disabled (set PHOENIX_HISTORY_DIR)")
+        return self.history_store.aggregate(table, start, end, value, by, filters)
+    
+    def get_quarterly_supply_usage(self, quarter: Optional[str] = None):
+        """
+        Returns aggregated usage of dressings/products for the current quarter
+        (or the given one, e.g. "2025-Q4").
+        """
+        return self.usage_store.quarter_summary(quarter)
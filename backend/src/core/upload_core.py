@@ -0,0 +1,79 @@
+"""
+Phoenix Core - Subida de imágenes en streaming
+Recibe la foto de la herida como multipart/form-data o cuerpo binario y la
+vuelca a un archivo temporal con límite de tamaño, sin pasar por base64.
+"""
+
+import os
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Tuple
+
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from .batch import spool_stream
+
+UPLOAD_MAX_BYTES = int(os.getenv("PHOENIX_UPLOAD_MAX_BYTES", str(15 * 1024 * 1024)))
+UPLOAD_IMAGE_FIELD = "image"
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+async def capped_stream(chunks: AsyncIterable[bytes], max_bytes: int = UPLOAD_MAX_BYTES) -> AsyncIterator[bytes]:
+    """Passes chunks through, failing as soon as more than max_bytes have arrived."""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        yield chunk
+
+
+async def read_binary_upload(request, max_bytes: int = UPLOAD_MAX_BYTES):
+    """Raw image body (image/*, application/octet-stream) -> rewound spooled file."""
+    _check_declared_length(request, max_bytes)
+    return await spool_stream(capped_stream(request.stream(), max_bytes))
+
+
+async def read_multipart_upload(request, max_bytes: int = UPLOAD_MAX_BYTES) -> Tuple[Any, Dict[str, str]]:
+    """
+    multipart/form-data with the photo in the "image" part and the clinical
+    fields (patient_id, notes, ...) as plain parts. Starlette's parser spools
+    file parts itself; the byte cap is applied to the incoming stream.
+    Returns (rewound file handle, fields). Raises ValueError for a
+    malformed body (e.g. no boundary) and UploadTooLarge past the cap.
+    """
+    _check_declared_length(request, max_bytes)
+    parser = MultiPartParser(request.headers, capped_stream(request.stream(), max_bytes))
+    form = None
+    try:
+        form = await parser.parse()
+    except MultiPartException as e:
+        raise ValueError(f"Invalid multipart body: {e.message}") from e
+    finally:
+        if form is None:
+            # Parts spooled before the failure (cap hit mid-body, broken stream)
+            for _, value in getattr(parser, "items", []):
+                if isinstance(value, UploadFile):
+                    await value.close()
+    image, fields = None, {}
+    for name, value in form.multi_items():
+        if isinstance(value, UploadFile):
+            if name == UPLOAD_IMAGE_FIELD and image is None:
+                image = value.file
+            else:
+                await value.close()
+        else:
+            fields[name] = value
+    if image is None:
+        raise ValueError(f"Missing '{UPLOAD_IMAGE_FIELD}' file part")
+    image.seek(0)
+    return image, fields
+
+
+def _check_declared_length(request, max_bytes: int):
+    # Reject early when the client announces an oversized body
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
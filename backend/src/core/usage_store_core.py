@@ -0,0 +1,240 @@
+"""
+Phoenix Core - Registro de consumo de insumos
+Eventos de uso de apósitos/productos en SQLite con agregados materializados
+que se actualizan en cada escritura (lectura del dashboard en O(1)).
+"""
+
+import math
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+from .schemas import CategoryUsage, SupplyUsageSummary
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+TREND_TOLERANCE = 0.05  # +-5% quarter over quarter counts as "steady"
+QUARTER_PATTERN = re.compile(r"^\d{4}-Q[1-4]$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    occurred_at TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    unit_cost REAL,
+    clinic_id TEXT
+);
+CREATE TABLE IF NOT EXISTS usage_quarterly (
+    quarter TEXT PRIMARY KEY,
+    units INTEGER NOT NULL,
+    costed_units INTEGER NOT NULL,
+    cost REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage_category_quarterly (
+    quarter TEXT NOT NULL,
+    category TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    PRIMARY KEY (quarter, category)
+);
+CREATE TABLE IF NOT EXISTS usage_monthly (
+    month TEXT PRIMARY KEY,
+    units INTEGER NOT NULL
+);
+"""
+
+
+def quarter_key(moment: datetime) -> str:
+    return f"{moment.year}-Q{(moment.month - 1) // 3 + 1}"
+
+
+def previous_quarter(quarter: str) -> str:
+    year, q = int(quarter[:4]), int(quarter[-1])
+    return f"{year - 1}-Q4" if q == 1 else f"{year}-Q{q - 1}"
+
+
+class SupplyUsageStore:
+    """
+    Append-only usage events plus three aggregate tables (per quarter, per
+    quarter and category, per month). Each record_usage() call inserts the
+    event and bumps the aggregates in the same transaction, so reads never
+    scan the event history. Built summaries are also kept in memory until
+    the next write.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("PHOENIX_USAGE_DB", "phoenix_usage.db")
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._summaries: Dict[str, SupplyUsageSummary] = {}
+
+    def record_usage(self, product_id: str, category: str, units: int, unit_cost: Optional[float] = None,
+                     clinic_id: Optional[str] = None, occurred_at: Union[datetime, str, None] = None) -> int:
+        """
+        Records one usage event and updates the aggregates incrementally.
+        Returns the event id.
+        """
+        product_id, category, units, unit_cost, clinic_id = normalize_usage_event(
+            product_id, category, units, unit_cost, clinic_id)
+        moment = _as_datetime(occurred_at)
+        quarter = quarter_key(moment)
+        cost = units * unit_cost if unit_cost is not None else 0.0
+        costed_units = units if unit_cost is not None else 0
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO usage_events (occurred_at, product_id, category, units, unit_cost, clinic_id) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (moment.isoformat(), product_id, category, units, unit_cost, clinic_id)
+            )
+            self._conn.execute(
+                "INSERT INTO usage_quarterly (quarter, units, costed_units, cost) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(quarter) DO UPDATE SET units = units + excluded.units, "
+                "costed_units = costed_units + excluded.costed_units, cost = cost + excluded.cost",
+                (quarter, units, costed_units, cost)
+            )
+            self._conn.execute(
+                "INSERT INTO usage_category_quarterly (quarter, category, units) VALUES (?, ?, ?) "
+                "ON CONFLICT(quarter, category) DO UPDATE SET units = units + excluded.units",
+                (quarter, category, units)
+            )
+            self._conn.execute(
+                "INSERT INTO usage_monthly (month, units) VALUES (?, ?) "
+                "ON CONFLICT(month) DO UPDATE SET units = units + excluded.units",
+                (moment.strftime("%Y-%m"), units)
+            )
+            # The next quarter's trends depend on this one
+            self._summaries.pop(quarter, None)
+            self._summaries.pop(_next_quarter(quarter), None)
+            return cursor.lastrowid
+
+    def quarter_summary(self, quarter: Optional[str] = None) -> SupplyUsageSummary:
+        """
+        Dashboard view of one quarter ("2025-Q4"; defaults to the current one).
+        Reads only aggregate rows: O(categories), independent of history size.
+        Raises ValueError for a malformed quarter.
+        """
+        quarter = quarter or quarter_key(datetime.utcnow())
+        if not QUARTER_PATTERN.fullmatch(quarter):
+            raise ValueError(f"Invalid quarter '{quarter}' (expected YYYY-Q1..Q4, e.g. 2025-Q4)")
+        with self._lock:
+            summary = self._summaries.get(quarter)
+            if summary is None:
+                summary = self._build_summary(quarter)
+                self._summaries[quarter] = summary
+            return summary
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _build_summary(self, quarter: str) -> SupplyUsageSummary:
+        previous = previous_quarter(quarter)
+        totals = self._quarter_totals(quarter)
+        previous_totals = self._quarter_totals(previous)
+        usage = self._category_units(quarter)
+        previous_usage = self._category_units(previous)
+
+        year, q = int(quarter[:4]), int(quarter[-1])
+        months = [(year, month) for month in range(3 * q - 2, 3 * q + 1)]
+        monthly = dict(self._conn.execute(
+            "SELECT month, units FROM usage_monthly WHERE month IN (?, ?, ?)",
+            tuple(f"{y}-{m:02d}" for y, m in months)
+        ).fetchall())
+
+        return SupplyUsageSummary(
+            period=f"Q{q} {year}",
+            total_units=totals["units"],
+            cost_efficiency=_cost_efficiency(totals, previous_totals),
+            categories=[
+                CategoryUsage(category, units, _trend(units, previous_usage.get(category, 0)))
+                for category, units in sorted(usage.items(), key=lambda item: item[1], reverse=True)
+            ],
+            monthly_breakdown={
+                MONTH_NAMES[m - 1]: monthly.get(f"{y}-{m:02d}", 0) for y, m in months
+            }
+        )
+
+    def _quarter_totals(self, quarter: str) -> Dict[str, Any]:
+        row = self._conn.execute(
+            "SELECT units, costed_units, cost FROM usage_quarterly WHERE quarter = ?", (quarter,)
+        ).fetchone()
+        units, costed_units, cost = row or (0, 0, 0.0)
+        return {"units": units, "costed_units": costed_units, "cost": cost}
+
+    def _category_units(self, quarter: str) -> Dict[str, int]:
+        return dict(self._conn.execute(
+            "SELECT category, units FROM usage_category_quarterly WHERE quarter = ?", (quarter,)
+        ).fetchall())
+
+
+def normalize_usage_event(product_id, category, units, unit_cost=None, clinic_id=None) -> tuple:
+    """
+    Validates and coerces one usage event as received from JSON: ids must be
+    strings, units a positive integer ("3" and 3.0 are accepted), unit_cost a
+    finite non-negative number or None. Raises ValueError otherwise.
+    """
+    if not isinstance(product_id, str) or not isinstance(category, str) or not product_id or not category:
+        raise ValueError("product_id and category are required strings")
+    if clinic_id is not None and not isinstance(clinic_id, str):
+        raise ValueError("clinic_id must be a string")
+    units_value = _as_number(units, "units")
+    if units_value <= 0 or not units_value.is_integer():
+        raise ValueError("units must be a positive integer")
+    if unit_cost is not None:
+        unit_cost = _as_number(unit_cost, "unit_cost")
+        if unit_cost < 0:
+            raise ValueError("unit_cost must not be negative")
+    return product_id, category, int(units_value), unit_cost, clinic_id
+
+
+def _as_number(value, name: str) -> float:
+    # bool is an int subclass: "units": true is not a quantity
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be a finite number")
+    return number
+
+
+def _as_datetime(value: Union[datetime, str, None]) -> datetime:
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _next_quarter(quarter: str) -> str:
+    year, q = int(quarter[:4]), int(quarter[-1])
+    return f"{year + 1}-Q1" if q == 4 else f"{year}-Q{q + 1}"
+
+
+def _trend(current: int, previous: int) -> str:
+    if previous == 0:
+        return "up" if current > 0 else "steady"
+    change = (current - previous) / previous
+    if change > TREND_TOLERANCE:
+        return "up"
+    if change < -TREND_TOLERANCE:
+        return "down"
+    return "steady"
+
+
+def _cost_efficiency(current: Dict[str, Any], previous: Dict[str, Any]) -> str:
+    # Efficiency = drop in average cost per unit versus the previous quarter
+    if not current["costed_units"] or not previous["costed_units"]:
+        return "N/A"
+    current_avg = current["cost"] / current["costed_units"]
+    previous_avg = previous["cost"] / previous["costed_units"]
+    if not previous_avg:
+        return "N/A"
+    return f"{(previous_avg - current_avg) / previous_avg:+.0%}"
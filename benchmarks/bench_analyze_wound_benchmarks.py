@@ -0,0 +1,96 @@
+"""
+Phoenix Core - Benchmark de análisis extremo a extremo
+PhoenixService.analyze_wound_image + serialización de la respuesta, con el
+Gateway de Med-Gemma sustituido por un transporte httpx en memoria: mide el
+coste propio de Phoenix (caché, normalización de imagen, reglas, catálogo)
+sin la latencia ni la variabilidad del modelo.
+
+Uso: python benchmarks/bench_analyze_wound.py [--gateway-latency-ms 0] [--image-side 2048]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import itertools
+import json
+import os
+import tempfile
+
+from harness import measure_async, print_table, save_results
+
+import httpx
+from PIL import Image
+
+from src.core.medgemma_wound_client import AsyncMedGemmaWoundClient
+from src.core.phoenix_service import PhoenixService
+from src.core.schemas import encode_json
+
+
+def stub_gateway(latency_s: float, calls: list) -> httpx.AsyncClient:
+    """AsyncClient whose transport answers /v1/copilot/invoke like the Gateway."""
+    model_output = json.loads(AsyncMedGemmaWoundClient()._fallback_response())
+    model_output.pop("fallback")  # a real answer: cacheable
+    body = json.dumps({"ai_analysis": json.dumps(model_output)}).encode()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(len(request.content))
+        if latency_s:
+            await asyncio.sleep(latency_s)
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def sample_photo(side: int) -> str:
+    image = Image.effect_noise((side, side), 48).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return base64.b64encode(output.getvalue()).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--gateway-latency-ms", type=float, default=0.0)
+    parser.add_argument("--image-side", type=int, default=2048, help="0 skips the case with a photo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Keep the usage store out of the working directory
+        os.environ.setdefault("PHOENIX_USAGE_DB", os.path.join(workdir, "usage.db"))
+        service = PhoenixService()
+        calls = []
+        service.medgemma = AsyncMedGemmaWoundClient(http_client=stub_gateway(args.gateway_latency_ms / 1000, calls))
+        counter = itertools.count()
+
+        async def analyze(data: dict) -> bytes:
+            return encode_json(await service.analyze_wound_image(data))
+
+        base = {"patient_id": "P-0001", "clinic_id": "C-01", "notes": "Úlcera venosa, exudado moderado"}
+        # Unique notes -> unique cache key -> one gateway call per analysis
+        cases = [
+            ("cache_miss", lambda: analyze({**base, "notes": f"{base['notes']} #{next(counter)}"})),
+            ("cache_hit", lambda: analyze(base)),
+        ]
+        if args.image_side:
+            photo = sample_photo(args.image_side)
+            cases.append((f"cache_miss_photo_{args.image_side}px",
+                          lambda: analyze({**base, "notes": f"{base['notes']} #{next(counter)}", "image_base64": photo})))
+
+        rows = []
+        try:
+            for name, factory in cases:
+                calls.clear()
+                timing = measure_async(factory, repeat=3, min_time=0.2)
+                rows.append({"case": name, "gateway_latency_ms": args.gateway_latency_ms,
+                             "us_per_analysis": timing["min_s"] * 1e6,
+                             "gateway_calls": len(calls), "gateway_request_bytes": max(calls, default=0), **timing})
+        finally:
+            service.image_normalizer.shutdown()
+
+    print_table(rows, ["case", "us_per_analysis", "gateway_calls", "gateway_request_bytes"])
+    print(f"\nSaved {save_results('analyze_wound', rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Phoenix Core - Benchmark de cifrado SafeCore
+Compara el formato hex/JSON (compatible con el SDK JS) con el sobre binario
+por chunks: throughput, tamaño en el cable y pico de memoria.
+
+Uso: python benchmarks/bench_encryption.py [--sizes 100000,1000000,5000000]
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import tempfile
+
+from harness import measure, peak_memory, print_table, save_results
+
+from safecore_sdk.encryption import SafeEncryption
+
+
+def bench_size(encryption: SafeEncryption, size: int, workdir: str) -> list:
+    image = os.urandom(size)  # stands in for a JPEG: incompressible bytes
+    legacy_wire = json.dumps(encryption.encrypt({"image_base64": base64.b64encode(image).decode()})).encode()
+    binary_wire = encryption.encrypt_bytes(image)
+
+    def legacy_encrypt():
+        return json.dumps(encryption.encrypt({"image_base64": base64.b64encode(image).decode()})).encode()
+
+    def legacy_decrypt():
+        return base64.b64decode(encryption.decrypt(json.loads(legacy_wire))["image_base64"])
+
+    plain_path = os.path.join(workdir, "plain.bin")
+    sealed_path = os.path.join(workdir, "sealed.bin")
+    with open(plain_path, "wb") as f:
+        f.write(image)
+    with open(sealed_path, "wb") as f:
+        f.write(binary_wire)
+
+    def stream_encrypt():
+        with open(plain_path, "rb") as src, open(os.path.join(workdir, "out.bin"), "wb") as dst:
+            encryption.encrypt_stream(src, dst)
+
+    def stream_decrypt():
+        with open(sealed_path, "rb") as src, open(os.path.join(workdir, "out.bin"), "wb") as dst:
+            encryption.decrypt_stream(src, dst)
+
+    cases = [
+        ("hex_json", "encrypt", legacy_encrypt, len(legacy_wire)),
+        ("hex_json", "decrypt", legacy_decrypt, len(legacy_wire)),
+        ("binary", "encrypt", lambda: encryption.encrypt_bytes(image), len(binary_wire)),
+        ("binary", "decrypt", lambda: encryption.decrypt_bytes(binary_wire), len(binary_wire)),
+        ("binary_stream", "encrypt", stream_encrypt, len(binary_wire)),
+        ("binary_stream", "decrypt", stream_decrypt, len(binary_wire)),
+    ]
+    rows = []
+    for fmt, operation, fn, wire_bytes in cases:
+        timing = measure(fn, repeat=3, min_time=0.1)
+        rows.append({
+            "size_bytes": size,
+            "format": fmt,
+            "operation": operation,
+            "mb_per_s": size / timing["min_s"] / 1e6,
+            "wire_bytes": wire_bytes,
+            "wire_ratio": wire_bytes / size,
+            "peak_mem_bytes": peak_memory(fn),
+            **timing,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000,5000000,20000000")
+    args = parser.parse_args()
+
+    encryption = SafeEncryption("benchmark-secret")
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(value) for value in args.sizes.split(",")):
+            rows.extend(bench_size(encryption, size, workdir))
+
+    print_table(rows, ["size_bytes", "format", "operation", "mb_per_s", "wire_ratio", "peak_mem_bytes"])
+    print(f"\nSaved {save_results('encryption', rows)}")
+
+
+if __name__ == "__main__":
+    main()
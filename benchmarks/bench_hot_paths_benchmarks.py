@@ -0,0 +1,122 @@
+"""
+Phoenix Core - Benchmark de rutas críticas
+Microbenchmarks de lo que se ejecuta en cada análisis: puntuación RESVECH y
+valoración TIMERS, recomendaciones del catálogo según su tamaño, cifrado
+SafeCore de payloads JSON y parseo de la salida de Med-Gemma.
+
+Uso: python benchmarks/bench_hot_paths.py [--catalog-sizes 4,1000,10000]
+     [--payload-sizes 1000,64000,1000000] [--groups scoring,catalog,crypto,parse]
+"""
+
+import argparse
+
+from harness import measure, print_table, save_results
+
+from safecore_sdk.encryption import SafeEncryption
+from src.core.analyzer import WoundAnalyzer
+from src.core.catalog import CatalogManager
+from src.core.medgemma_wound_client import MedGemmaWoundClient
+
+PARAMETER_PROFILES = {
+    "slough_infected_es": {"size": 3, "depth": 2, "edges": 2, "tissue_type": 4, "exudate": 4,
+                           "infection_inflammation": 6, "tissue_type_desc": "Esfacelo 40%, tejido necrótico",
+                           "exudate_desc": "Exudado abundante", "edges_desc": "Bordes socavados"},
+    "healthy_en": {"size": 1, "depth": 1, "edges": 0, "tissue_type": 1, "exudate": 1,
+                   "infection_inflammation": 0, "tissue_type_desc": "Healthy granulation",
+                   "exudate_desc": "Low", "edges_desc": "Advancing epithelium"},
+    "empty": {},
+}
+
+
+def synthetic_catalog(size: int) -> list:
+    """Copies of the default products with unique ids and spread thresholds."""
+    base = CatalogManager().products
+    catalog = []
+    for i in range(size):
+        product = base[i % len(base)]
+        rules = {rule: value + (i // len(base)) % 4 if rule.startswith("resvech_") else value
+                 for rule, value in product["rules"].items()}
+        catalog.append({**product, "id": f"{product['id']}-{i}", "rules": rules})
+    return catalog
+
+
+def bench_scoring() -> list:
+    analyzer = WoundAnalyzer()
+    rows = []
+    for profile, parameters in PARAMETER_PROFILES.items():
+        for case, fn in (("calculate_resvech_score", lambda: analyzer.calculate_resvech_score(parameters)),
+                         ("get_timers_assessment", lambda: analyzer.get_timers_assessment(parameters))):
+            rows.append(_row("scoring", case, profile, measure(fn)))
+    return rows
+
+
+def bench_catalog(sizes) -> list:
+    analyzer = WoundAnalyzer()
+    rows = []
+    for size in sizes:
+        catalog = CatalogManager()
+        catalog.load_products(synthetic_catalog(size))
+        for profile, parameters in PARAMETER_PROFILES.items():
+            timers = analyzer.get_timers_assessment(parameters)
+            score = analyzer.calculate_resvech_score(parameters)
+            result = catalog.get_recommendations(timers, score, parameters)
+            timing = measure(lambda: catalog.get_recommendations(timers, score, parameters))
+            rows.append(_row("catalog", "get_recommendations", f"{size}_products/{profile}", timing,
+                             recommended=len(result["recommended"]), misaligned=len(result["misaligned"])))
+    return rows
+
+
+def bench_crypto(sizes) -> list:
+    encryption = SafeEncryption("benchmark-secret")
+    rows = []
+    for size in sizes:
+        payload = {"patient_id": "P-0001", "clinic_id": "C-01", "notes": "x" * size}
+        sealed = encryption.encrypt(payload)
+        assert encryption.decrypt(sealed) == payload
+        for case, fn in (("encrypt", lambda: encryption.encrypt(payload)), ("decrypt", lambda: encryption.decrypt(sealed))):
+            timing = measure(fn, repeat=3, min_time=0.1)
+            rows.append(_row("crypto", case, f"{size}_bytes", timing, mb_per_s=size / timing["min_s"] / 1e6))
+    return rows
+
+
+def bench_parse() -> list:
+    client = MedGemmaWoundClient()
+    raw = client._fallback_response()
+    cases = {
+        "fenced_json": "```json\n" + raw + "\n```",
+        "bare_json": raw,
+        "dict_passthrough": client._parse_response(raw),
+        "invalid_text": "The wound shows slough; no JSON here.",
+    }
+    return [_row("parse", "_parse_response", name, measure(lambda: client._parse_response(output)))
+            for name, output in cases.items()]
+
+
+def _row(group: str, case: str, param: str, timing: dict, **extra) -> dict:
+    return {"group": group, "case": case, "param": param, "us_per_call": timing["min_s"] * 1e6, **extra, **timing}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog-sizes", default="4,1000,10000")
+    parser.add_argument("--payload-sizes", default="1000,64000,1000000")
+    parser.add_argument("--groups", default="scoring,catalog,crypto,parse")
+    args = parser.parse_args()
+
+    groups = set(args.groups.split(","))
+    rows = []
+    if "scoring" in groups:
+        rows += bench_scoring()
+    if "catalog" in groups:
+        rows += bench_catalog(int(value) for value in args.catalog_sizes.split(","))
+    if "crypto" in groups:
+        rows += bench_crypto(int(value) for value in args.payload_sizes.split(","))
+    if "parse" in groups:
+        rows += bench_parse()
+
+    print_table(rows, ["group", "case", "param", "us_per_call", "recommended", "mb_per_s"])
+    print(f"\nSaved {save_results('hot_paths', rows)}")
+
+
+if __name__ == "__main__":
+    main()
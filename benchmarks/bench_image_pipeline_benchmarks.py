@@ -0,0 +1,86 @@
+"""
+Phoenix Core - Benchmark de normalización de imágenes
+Latencia por imagen (en proceso y a través del pool) y tamaño del payload
+al Gateway antes/después de reducir una foto de tablet (12 MP por defecto).
+
+Uso: python benchmarks/bench_image_pipeline.py [--sizes 4000x3000,1920x1080] [--max-side 1024]
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import time
+
+from harness import measure, peak_memory, print_table, save_results
+
+from PIL import Image
+
+from src.core.image_pipeline import ImageNormalizer, normalize_image
+from src.core.medgemma_wound_client import MedGemmaWoundClient
+
+EXIF_ORIENTATION = 0x0112
+
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    # Smooth gradient plus noise compresses roughly like a real photo; tagged as rotated
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    image = Image.merge("RGB", (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=92, exif=exif)
+    return output.getvalue()
+
+
+def payload_bytes(client: MedGemmaWoundClient, image_base64: str) -> int:
+    payload = client._build_payload(client._build_wound_prompt({"patient_id": "bench"}), True, image_base64)
+    return len(json.dumps(payload))
+
+
+async def pool_latency(normalizer: ImageNormalizer, photo: bytes, concurrency: int) -> float:
+    await normalizer.normalize(photo)  # warm the pool
+    started = time.perf_counter()
+    await asyncio.gather(*(normalizer.normalize(photo) for _ in range(concurrency)))
+    return (time.perf_counter() - started) / concurrency
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="4000x3000,1920x1080")
+    parser.add_argument("--max-side", type=int, default=1024)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    client = MedGemmaWoundClient()
+    normalizer = ImageNormalizer(max_side=args.max_side)
+    rows = []
+    try:
+        for size in args.sizes.split(","):
+            width, height = (int(value) for value in size.split("x"))
+            photo = synthetic_photo(width, height)
+            normalized = normalize_image(photo, args.max_side)
+            timing = measure(lambda: normalize_image(photo, args.max_side), repeat=3, min_time=0.2)
+            rows.append({
+                "image": size,
+                "original_bytes": len(photo),
+                "normalized_bytes": len(normalized["image_bytes"]),
+                "normalized_size": f"{normalized['width']}x{normalized['height']}",
+                "payload_before": payload_bytes(client, base64.b64encode(photo).decode()),
+                "payload_after": payload_bytes(client, base64.b64encode(normalized["image_bytes"]).decode()),
+                "latency_ms": timing["min_s"] * 1000,
+                "pool_ms_per_image": asyncio.run(pool_latency(normalizer, photo, args.concurrency)) * 1000,
+                "peak_mem_bytes": peak_memory(lambda: normalize_image(photo, args.max_side)),
+                **timing,
+            })
+    finally:
+        normalizer.shutdown()
+
+    print_table(rows, ["image", "normalized_size", "payload_before", "payload_after", "latency_ms", "pool_ms_per_image"])
+    print(f"\nSaved {save_results('image_pipeline', rows)}")
+
+
+if __name__ == "__main__":
+    main()
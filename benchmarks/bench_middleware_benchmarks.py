@@ -0,0 +1,76 @@
+"""
+Phoenix Core - Benchmark del middleware de descifrado SafeCore
+Requests/segundo de PhoenixDecryptionMiddleware (BaseHTTPMiddleware) frente a
+SafeCoreDecryptionMiddleware (ASGI puro) sobre una ruta JSON mínima.
+
+Uso: python benchmarks/bench_middleware.py [--requests 2000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from harness import print_table, save_results
+
+os.environ.setdefault("SAFECORE_CLIENT_SECRET", "benchmark-secret")
+
+import httpx
+from fastapi import FastAPI, Request
+
+from safecore_sdk.encryption import SafeEncryption
+from safecore_sdk.middleware import PhoenixDecryptionMiddleware, SafeCoreDecryptionMiddleware
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.post("/api/echo")
+    async def echo(request: Request):
+        # The legacy middleware leaves the plaintext in request.state
+        data = getattr(request.state, "decrypted_body", None) or await request.json()
+        return {"keys": len(data)}
+
+    return app
+
+
+async def run(app: FastAPI, body: dict, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"x-safecore-encrypted": "true"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.post("/api/echo", json=body, headers=headers)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sizes", default="1000,100000")
+    args = parser.parse_args()
+
+    encryption = SafeEncryption()
+    rows = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        body = encryption.encrypt({"patient_id": "bench", "notes": "x" * size})
+        for name, middleware in (("base_http", PhoenixDecryptionMiddleware), ("pure_asgi", SafeCoreDecryptionMiddleware)):
+            app = build_app(middleware)
+            asyncio.run(run(app, body, min(100, args.requests), args.concurrency))  # warm-up
+            rps = asyncio.run(run(app, body, args.requests, args.concurrency))
+            rows.append({"payload_bytes": size, "middleware": name, "requests_per_s": rps})
+
+    print_table(rows, ["payload_bytes", "middleware", "requests_per_s"])
+    print(f"\nSaved {save_results('middleware', rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Phoenix Core - Benchmark de cifrado de respuestas SafeCore
+Throughput de respuestas JSON de 1 KB, 100 KB y 5 MB: en claro, cifradas en el
+event loop y cifradas en el thread pool. También mide el retraso máximo del event
+loop (lag) mientras corre la carga.
+
+Uso: python benchmarks/bench_response_encryption.py [--requests 200] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from harness import print_table, save_results
+
+os.environ.setdefault("SAFECORE_CLIENT_SECRET", "benchmark-secret")
+
+import httpx
+from fastapi import FastAPI, Response
+
+from safecore_sdk.encryption import SafeEncryption
+from safecore_sdk.middleware import SafeCoreDecryptionMiddleware
+
+SIZES = {"1KB": 1_000, "100KB": 100_000, "5MB": 5_000_000}
+MODES = {
+    "plaintext": None,
+    "encrypted_inline": float("inf"),
+    "encrypted_offloaded": 64 * 1024,
+}
+
+
+def build_app(body: bytes, offload_threshold) -> FastAPI:
+    app = FastAPI()
+    if offload_threshold is not None:
+        app.add_middleware(SafeCoreDecryptionMiddleware, encrypt_responses=True, offload_threshold=offload_threshold)
+
+    @app.post("/api/report")
+    async def report():
+        return Response(content=body, media_type="application/json")
+
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> dict:
+    request_body = SafeEncryption().encrypt({"patient_id": "bench"})
+    transport = httpx.ASGITransport(app=app)
+    max_lag = 0.0
+    running = True
+
+    async def probe():
+        # Sleeps 1 ms at a time; anything beyond that is time the loop was blocked
+        nonlocal max_lag
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.001)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.post("/api/report", json=request_body, headers={"x-safecore-encrypted": "true"})
+                response.raise_for_status()
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        running = False
+        await probe_task
+    return {"requests_per_s": requests / elapsed, "max_loop_lag_ms": max_lag * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    rows = []
+    for label, size in SIZES.items():
+        body = json.dumps({"blob": "x" * (size - 12)}).encode()
+        requests = args.requests if size < 1_000_000 else max(20, args.requests // 10)
+        for mode, threshold in MODES.items():
+            result = asyncio.run(run(build_app(body, threshold), requests, args.concurrency))
+            rows.append({
+                "size": label, "mode": mode,
+                "mb_per_s": result["requests_per_s"] * size / 1e6,
+                **result,
+            })
+
+    print_table(rows, ["size", "mode", "requests_per_s", "mb_per_s", "max_loop_lag_ms"])
+    print(f"\nSaved {save_results('response_encryption', rows)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Phoenix Core - Benchmark de serialización
+Coste por respuesta de análisis, estadísticas y propuesta: ruta por defecto de
+FastAPI (jsonable_encoder + json de la stdlib) frente a Structs msgspec, y
+parseo de la salida de Med-Gemma (json.loads frente a _parse_response).
+
+Uso: python benchmarks/bench_serialization.py [--products 4,20] [--description-chars 600]
+"""
+
+import argparse
+import json
+
+from harness import measure, print_table, save_results
+
+import msgspec
+from fastapi.encoders import jsonable_encoder
+
+from src.core.analyzer import WoundAnalyzer
+from src.core.catalog import CatalogManager
+from src.core.medgemma_wound_client import MedGemmaWoundClient
+from src.core.schemas import (
+    AnalysisResponse, AnalysisSummary, AstraMetadata, CategoryUsage, ProposalResponse, SupplyUsageSummary,
+    TimersEntry, encode_json
+)
+
+
+def fastapi_default(content) -> bytes:
+    # What a route returning a dict costs: serialize_response -> JSONResponse.render
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def analysis_response(products: int, description_chars: int) -> AnalysisResponse:
+    analyzer = WoundAnalyzer()
+    base = CatalogManager().products
+    catalog = [
+        {**base[i % len(base)], "id": f"P{i}", "description": "Apósito de espuma " * (description_chars // 18)}
+        for i in range(products)
+    ]
+    parameters = {"tissue_type_desc": "Esfacelo 40%", "infection_inflammation": 3, "exudate_desc": "Alto",
+                  "edges_desc": "Socavados", "size": 3, "depth": 2}
+    timers = analyzer.get_timers_assessment(parameters)
+    return AnalysisResponse(
+        model_used="Med-Gemma-2b (Wound-Tuned)",
+        resvech_score=analyzer.calculate_resvech_score(parameters),
+        timers={key: TimersEntry(entry["status"], entry["action"]) for key, entry in timers.items()},
+        biofilm_protocol=analyzer.get_biofilm_protocol(3),
+        sponsored_products=catalog[: products // 2 or 1],
+        misaligned_products=[{**product, "rejection_reasons": ["Contrainduced"]} for product in catalog[products // 2:]],
+        analysis=AnalysisSummary("Esfacelo 40%", "Riesgo moderado", "Desbridamiento autolítico"),
+        astra_metadata=AstraMetadata("Dynamic", "Standard_Upload", {"width": 1024, "height": 768, "phash": "0" * 16}),
+    )
+
+
+def stats_response() -> SupplyUsageSummary:
+    return SupplyUsageSummary(
+        period="Q4 2025", total_units=1250, cost_efficiency="+12%",
+        categories=[CategoryUsage(f"category-{i}", 100 - i, "up") for i in range(12)],
+        monthly_breakdown={"Oct": 400, "Nov": 420, "Dec": 430},
+    )
+
+
+def proposal_response() -> ProposalResponse:
+    return ProposalResponse(success=True, proposal_text="Propuesta de nueva tecnología. " * 200,
+                            metadata={"model": "HealthEconomicsAI", "timestamp": "now"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", default="4,20,100")
+    parser.add_argument("--description-chars", type=int, default=600)
+    args = parser.parse_args()
+
+    cases = [(f"analysis_{n}_products", analysis_response(n, args.description_chars))
+             for n in (int(value) for value in args.products.split(","))]
+    cases += [("supply_stats", stats_response()), ("proposal", proposal_response())]
+
+    rows = []
+    for name, struct in cases:
+        as_dict = msgspec.to_builtins(struct)
+        assert json.loads(fastapi_default(as_dict)) == json.loads(encode_json(struct))
+        for method, fn in (("fastapi_default", lambda: fastapi_default(as_dict)), ("msgspec", lambda: encode_json(struct))):
+            timing = measure(fn)
+            rows.append({"case": name, "method": method, "bytes": len(fn()), "us_per_response": timing["min_s"] * 1e6, **timing})
+
+    client = MedGemmaWoundClient()
+    model_output = "```json\n" + client._fallback_response() + "\n```"
+    clean = model_output.strip()[7:-3]
+    for method, fn in (("json_loads", lambda: json.loads(clean)), ("parse_response", lambda: client._parse_response(model_output))):
+        timing = measure(fn)
+        rows.append({"case": "parse_model_output", "method": method, "bytes": len(model_output),
+                     "us_per_response": timing["min_s"] * 1e6, **timing})
+
+    print_table(rows, ["case", "method", "bytes", "us_per_response"])
+    print(f"\nSaved {save_results('serialization', rows)}")
+
+
+if __name__ == "__main__":
+    main()
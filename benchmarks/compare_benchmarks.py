@@ -0,0 +1,67 @@
+"""
+Phoenix Core - Comparación de resultados de benchmark
+Compara dos JSON de benchmarks/results (p. ej. el de main y el de una rama)
+fila a fila por min_s y marca las regresiones por encima del umbral.
+Termina con código 1 si hay alguna, para poder usarlo en CI.
+
+Uso: python benchmarks/compare.py results/hot_paths-<base>.json results/hot_paths-<head>.json [--threshold 0.10]
+"""
+
+import argparse
+import json
+import sys
+
+from harness import print_table
+
+# Measurements (and their derivatives) never identify a row
+METRIC_FIELDS = {"number", "repeat", "peak_mem_bytes", "gateway_calls", "gateway_request_bytes",
+                 "recommended", "misaligned", "wire_bytes", "bytes"}
+
+
+def row_key(row: dict) -> tuple:
+    return tuple((field, value) for field, value in row.items()
+                 if field not in METRIC_FIELDS and not isinstance(value, float))
+
+
+def compare(base: dict, head: dict, threshold: float) -> list:
+    base_rows = {row_key(row): row for row in base["results"]}
+    rows = []
+    for row in head["results"]:
+        key = row_key(row)
+        if key not in base_rows:
+            continue
+        ratio = row["min_s"] / base_rows[key]["min_s"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else ""
+        rows.append({"row": " ".join(str(value) for _, value in key),
+                     "base_us": base_rows[key]["min_s"] * 1e6, "head_us": row["min_s"] * 1e6,
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown reported as regression")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    if base["benchmark"] != head["benchmark"]:
+        sys.exit(f"Different benchmarks: {base['benchmark']} vs {head['benchmark']}")
+
+    rows = compare(base, head, args.threshold)
+    if not rows:
+        sys.exit("No comparable rows")
+    print(f"{base['benchmark']}: {base['commit']} -> {head['commit']}\n")
+    print_table(rows, ["row", "base_us", "head_us", "ratio", "status"])
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Phoenix Core - Utilidades de benchmark
+Medición de tiempos, pico de memoria y guardado de resultados en JSON
+compartidos por los scripts de benchmarks/.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Untracked (see .gitignore); PHOENIX_BENCH_RESULTS_DIR writes them elsewhere
+RESULTS_DIR = os.getenv("PHOENIX_BENCH_RESULTS_DIR") or os.path.join(REPO_ROOT, "benchmarks", "results")
+
+# backend/ first so `src.core` resolves to the API package; the repo root
+# provides safecore_sdk and services.
+for _path in (REPO_ROOT, os.path.join(REPO_ROOT, "backend")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, min_time: float = 0.2, number: Optional[int] = None) -> Dict[str, float]:
+    """
+    Times fn() like timeit: `number` calls per round (auto-ranged so a round
+    lasts at least min_time), `repeat` rounds. Reports per-call seconds.
+    """
+    if number is None:
+        number = 1
+        while True:
+            elapsed = _run(fn, number)
+            if elapsed >= min_time or number >= 1_000_000:
+                break
+            number *= 10 if elapsed < min_time / 10 else 2
+    rounds = [_run(fn, number) / number for _ in range(repeat)]
+    best = min(rounds)
+    return {
+        "mean_s": sum(rounds) / len(rounds),
+        "min_s": best,
+        "ops_per_s": 1 / best if best else float("inf"),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def measure_async(factory: Callable[[], Any], **kwargs) -> Dict[str, float]:
+    """measure() for coroutine functions, all rounds on one event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return measure(lambda: loop.run_until_complete(factory()), **kwargs)
+    finally:
+        loop.close()
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated through the Python allocator while fn() runs."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def save_results(name: str, results: List[Dict[str, Any]]) -> str:
+    """Writes <RESULTS_DIR>/<name>-<commit>.json and returns its path."""
+    commit = git_commit()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{name}-{commit}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "benchmark": name,
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+    return path
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]):
+    widths = {column: max(len(column), *(len(_fmt(row.get(column))) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(column)).ljust(widths[column]) for column in columns))
+
+
+def _run(fn: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return "" if value is None else str(value)
@@ -0,0 +1,186 @@
+"""
+Phoenix Core - Prueba de carga de /api/analyze_wound
+Lanza peticiones en bucle cerrado con niveles crecientes de concurrencia y
+reporta throughput y latencias p50/p95/p99 por nivel, para encontrar el punto
+de saturación de un worker. Con --spawn arranca el Gateway simulado
+(stub_gateway.py) y un Phoenix con un solo worker apuntando a él.
+
+Uso: python benchmarks/load_analyze_wound.py --spawn [--gateway-args "--latency lognormal:800,0.4"]
+     python benchmarks/load_analyze_wound.py --url http://127.0.0.1:8000 [--concurrency 1,2,4,8,16,32,64]
+     [--duration 10] [--image foto.jpg] [--repeat-request]
+"""
+
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from harness import REPO_ROOT, print_table, save_results
+
+import httpx
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SATURATION_GAIN = 1.10  # a step must add 10% throughput to count as scaling
+
+
+def percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_step(client: httpx.AsyncClient, url: str, concurrency: int, duration: float, make_body) -> dict:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, content=make_body(), headers={"content-type": "application/json"})
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": (latencies[-1] if latencies else float("nan")) * 1000,
+    }
+
+
+def saturation_point(rows: list):
+    """Last concurrency level that still raised throughput by SATURATION_GAIN."""
+    for previous, row in zip(rows, rows[1:]):
+        if row["throughput_rps"] < previous["throughput_rps"] * SATURATION_GAIN:
+            return previous["concurrency"]
+    return None
+
+
+async def drive(args) -> list:
+    base = {"patient_id": "LOAD-0001", "clinic_id": "C-LOAD", "notes": "Úlcera venosa, exudado moderado"}
+    if args.image:
+        with open(args.image, "rb") as f:
+            base["image_base64"] = base64.b64encode(f.read()).decode()
+    counter = itertools.count()
+
+    def make_body() -> bytes:
+        if args.repeat_request:
+            return json.dumps(base).encode()
+        # Unique notes -> unique cache key: every request reaches the gateway
+        return json.dumps({**base, "notes": f"{base['notes']} #{next(counter)}"}).encode()
+
+    levels = [int(value) for value in args.concurrency.split(",")]
+    url = args.url.rstrip("/") + "/api/analyze_wound"
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    rows = []
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        if args.warmup:
+            await run_step(client, url, levels[0], args.warmup, make_body)
+        for concurrency in levels:
+            row = await run_step(client, url, concurrency, args.duration, make_body)
+            print(f"[Load] c={concurrency:<4} {row['throughput_rps']:8.1f} req/s  p50 {row['p50_ms']:.0f} ms  "
+                  f"p99 {row['p99_ms']:.0f} ms  errors {row['errors']}")
+            rows.append(row)
+    return rows
+
+
+@contextmanager
+def spawned_stack(args):
+    """Stub gateway + single-worker Phoenix as subprocesses, stopped on exit."""
+    gateway_url = f"http://127.0.0.1:{args.gateway_port}/v1/copilot/invoke"
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {
+            **os.environ,
+            "DANIEL_GATEWAY_URL": gateway_url,
+            "GATEWAY_URL": gateway_url,
+            "PHOENIX_USAGE_DB": os.path.join(workdir, "usage.db"),
+            "PYTHONPATH": os.pathsep.join([BENCH_DIR, os.path.join(REPO_ROOT, "backend"), REPO_ROOT]),
+        }
+        processes = [
+            subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "stub_gateway.py"),
+                              "--port", str(args.gateway_port), *shlex.split(args.gateway_args)], env=env),
+            subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+                              "--workers", "1", "--log-level", "warning"], cwd=os.path.join(REPO_ROOT, "backend"), env=env),
+        ]
+        try:
+            _wait_ready(f"http://127.0.0.1:{args.gateway_port}/stats")
+            _wait_ready(f"http://127.0.0.1:{args.port}/")
+            yield f"http://127.0.0.1:{args.port}", f"http://127.0.0.1:{args.gateway_port}/stats"
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+
+
+def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Phoenix base URL (ignored with --spawn)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32,64")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds at the first level, not reported")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--image", help="photo sent as image_base64")
+    parser.add_argument("--repeat-request", action="store_true", help="same request every time (result cache path)")
+    parser.add_argument("--spawn", action="store_true", help="start the stub gateway and a single-worker Phoenix")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--gateway-port", type=int, default=4100)
+    parser.add_argument("--gateway-args", default="--latency fixed:200", help="arguments for stub_gateway.py")
+    args = parser.parse_args()
+
+    if args.spawn:
+        with spawned_stack(args) as (args.url, gateway_stats_url):
+            rows = asyncio.run(drive(args))
+            print(f"\n[Load] Gateway: {httpx.get(gateway_stats_url).json()}")
+    else:
+        rows = asyncio.run(drive(args))
+
+    print()
+    print_table(rows, ["concurrency", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    knee = saturation_point(rows)
+    if knee is not None:
+        print(f"\nThroughput stops scaling after concurrency {knee}")
+    print(f"Saved {save_results('load_analyze_wound', rows)}")
+
+
+if __name__ == "__main__":
+    main()
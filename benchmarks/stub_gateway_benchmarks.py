@@ -0,0 +1,144 @@
+"""
+Phoenix Core - Gateway simulado para pruebas de carga
+Habla el protocolo /v1/copilot/invoke que usan MedGemmaWoundClient
+(type "wound_analysis" -> {"ai_analysis": "<json>"}) y ProposalGenerator
+(type "text_generation" -> {"content": ...}, o SSE con "stream": true), con
+latencia, tasa de errores y tamaño de respuesta configurables.
+
+Latencias (ms): fixed:200 | uniform:50,400 | normal:200,40 | lognormal:200,0.5
+(mediana, sigma) | exp:200 (media).
+
+Uso: python benchmarks/stub_gateway.py [--port 4000] [--latency lognormal:800,0.4]
+     [--error-rate 0.02] [--error-status 503] [--payload-bytes 2000]
+Luego: DANIEL_GATEWAY_URL=http://127.0.0.1:4000/v1/copilot/invoke
+       GATEWAY_URL=http://127.0.0.1:4000/v1/copilot/invoke uvicorn main:app
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+from typing import Callable
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import harness  # noqa: F401  (puts backend/ on sys.path)
+from src.core.medgemma_wound_client import MedGemmaWoundClient
+
+INVOKE_PATH = "/v1/copilot/invoke"
+
+
+def latency_sampler(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Parses a latency spec (milliseconds) into a sampler returning seconds."""
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    samplers = {
+        "fixed": lambda ms: ms,
+        "uniform": lambda low, high: rng.uniform(low, high),
+        "normal": lambda mean, stddev: rng.gauss(mean, stddev),
+        "lognormal": lambda median, sigma: rng.lognormvariate(math.log(median), sigma),
+        "exp": lambda mean: rng.expovariate(1 / mean),
+    }
+    if kind not in samplers:
+        raise ValueError(f"Unknown latency distribution: {kind} (use {', '.join(samplers)})")
+    sample = samplers[kind]
+    try:
+        sample(*values)
+    except TypeError:
+        raise ValueError(f"Wrong parameters for {kind}: {params}")
+    return lambda: max(0.0, sample(*values)) / 1000
+
+
+class StubGateway:
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, error_status: int = 503,
+                 payload_bytes: int = 0, stream_chunks: int = 20, seed=None):
+        self.rng = random.Random(seed)
+        self.latency = latency_sampler(latency, self.rng)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stream_chunks = stream_chunks
+        self.counters = {"requests": 0, "errors": 0, "wound_analysis": 0, "text_generation": 0, "in_flight": 0,
+                         "max_in_flight": 0}
+
+        model_output = json.loads(MedGemmaWoundClient()._fallback_response())
+        model_output.pop("fallback")  # a real answer: Phoenix caches it
+        # Pad the free-text field to the requested response size
+        padding = max(0, payload_bytes - len(json.dumps(model_output)))
+        if padding:
+            model_output["risk_analysis"] += " " + "x" * padding
+        self.wound_body = json.dumps({"ai_analysis": json.dumps(model_output)}).encode()
+        self.proposal_text = "Propuesta de inclusión de nueva tecnología. " * max(1, payload_bytes // 44)
+
+    async def invoke(self, request: Request) -> Response:
+        if request.method == "HEAD":
+            return Response()  # warm-up pre-connect
+        counters = self.counters
+        counters["requests"] += 1
+        counters["in_flight"] += 1
+        counters["max_in_flight"] = max(counters["max_in_flight"], counters["in_flight"])
+        streaming = False
+        try:
+            payload = json.loads(await request.body())
+            kind = payload.get("type", "")
+            counters[kind] = counters.get(kind, 0) + 1
+            delay = self.latency()
+            if self.rng.random() < self.error_rate:
+                counters["errors"] += 1
+                await asyncio.sleep(delay)
+                return JSONResponse({"error": "stub gateway: injected failure"}, status_code=self.error_status)
+            if kind == "text_generation" and payload.get("stream"):
+                streaming = True  # in flight until the last chunk
+                return StreamingResponse(self._stream(delay), media_type="text/event-stream")
+            await asyncio.sleep(delay)
+            if kind == "text_generation":
+                return JSONResponse({"content": self.proposal_text})
+            return Response(self.wound_body, media_type="application/json")
+        finally:
+            if not streaming:
+                counters["in_flight"] -= 1
+
+    async def _stream(self, delay: float):
+        # Latency spread over the chunks, like a model producing tokens
+        step = len(self.proposal_text) // self.stream_chunks + 1
+        try:
+            for start in range(0, len(self.proposal_text), step):
+                await asyncio.sleep(delay / self.stream_chunks)
+                yield f"data: {json.dumps({'delta': self.proposal_text[start:start + step]})}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            self.counters["in_flight"] -= 1
+
+    async def stats(self, request: Request) -> Response:
+        return JSONResponse(self.counters)
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[
+            Route(INVOKE_PATH, self.invoke, methods=["POST", "HEAD"]),
+            Route("/stats", self.stats),
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4000)
+    parser.add_argument("--latency", default="fixed:200", help="latency distribution in ms (see above)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--payload-bytes", type=int, default=0, help="approximate response body size")
+    parser.add_argument("--stream-chunks", type=int, default=20)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    gateway = StubGateway(args.latency, args.error_rate, args.error_status, args.payload_bytes,
+                          args.stream_chunks, args.seed)
+    uvicorn.run(gateway.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
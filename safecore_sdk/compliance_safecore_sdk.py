@@ -1,13 +1,28 @@
 import os
 import json
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+REFRESH_INTERVAL_S = float(os.getenv('SAFECORE_MANIFEST_REFRESH', '5'))
 
 class ComplianceValidator:
     def __init__(self, root_path=None):
         self.root_path = root_path or os.getcwd()
         self.manifest_path = os.path.join(self.root_path, 'manifest.json')
+        self._cached_key = None
+        self._cached_result = None
 
     def validate(self):
+        # Re-parse only when the manifest changed (mtime/size); otherwise reuse the last result
+        key = _stat_key(self.manifest_path)
+        if key is not None and key == self._cached_key:
+            return self._cached_result
+        result = self._validate_file()
+        self._cached_key, self._cached_result = key, result
+        return result
+
+    def _validate_file(self):
         try:
             if not os.path.exists(self.manifest_path):
                 return {"valid": False, "error": "Manifest missing. Compliance check failed."}
@@ -15,28 +30,118 @@ class ComplianceValidator:
             with open(self.manifest_path, 'r') as f:
                 manifest = json.load(f)
 
-            # Required Fields Check
-            required = ['project_name', 'compliance_level', 'features']
-            for field in required:
-                if field not in manifest:
-                    return {"valid": False, "error": f"Missing required field: {field}"}
-
-            # Compliance Fingerprint (deterministic base64 representation of security state)
-            compliance_data = {
-                "id": manifest.get("project_id", "unregistered"),
-                "level": manifest.get("compliance_level"),
-                "features": manifest.get("features")
-            }
-            
-            # Match JS behavior: compact JSON (no spaces)
-            compact_json = json.dumps(compliance_data, separators=(',', ':'))
-            fingerprint = base64.b64encode(compact_json.encode()).decode()
-
-            return {
-                "valid": True,
-                "packageName": manifest.get("project_name"),
-                "level": manifest.get("compliance_level"),
-                "fingerprint": fingerprint
-            }
+            return validate_manifest(manifest)
         except Exception as e:
             return {"valid": False, "error": f"Validation Error: {str(e)}"}
+
+
+def validate_manifest(manifest: dict) -> dict:
+    # Required Fields Check
+    required = ['project_name', 'compliance_level', 'features']
+    for field in required:
+        if field not in manifest:
+            return {"valid": False, "error": f"Missing required field: {field}"}
+
+    # Compliance Fingerprint (deterministic base64 representation of security state)
+    compliance_data = {
+        "id": manifest.get("project_id", "unregistered"),
+        "level": manifest.get("compliance_level"),
+        "features": manifest.get("features")
+    }
+    
+    # Match JS behavior: compact JSON (no spaces)
+    compact_json = json.dumps(compliance_data, separators=(',', ':'))
+    fingerprint = base64.b64encode(compact_json.encode()).decode()
+
+    return {
+        "valid": True,
+        "packageName": manifest.get("project_name"),
+        "level": manifest.get("compliance_level"),
+        "fingerprint": fingerprint
+    }
+
+
+class ComplianceRegistry:
+    """
+    Validates the manifests of every bundled core (BioCore, Core-database,
+    Daniel-AI-SafeCore, ...) in parallel at startup, then keeps the results
+    in memory. A background thread re-validates a manifest when its
+    mtime/size changes. get()/is_compliant() are plain dict lookups, cheap
+    enough to gate every request without disk I/O.
+    """
+
+    def __init__(self, roots=None, refresh_interval: float = REFRESH_INTERVAL_S):
+        if roots is None:
+            roots = [path for path in os.getenv('SAFECORE_MANIFEST_ROOTS', '').split(os.pathsep) if path]
+        if not isinstance(roots, dict):
+            roots = {os.path.basename(os.path.normpath(path)): path for path in roots}
+        self.validators = {name: ComplianceValidator(path) for name, path in roots.items()}
+        self.refresh_interval = refresh_interval
+        self._results = {}
+        self._stop = threading.Event()
+        self._watcher = None
+        self._pool = None  # one executor for the registry's lifetime, not one per refresh
+
+    @classmethod
+    def discover(cls, base_dir: str, **kwargs):
+        """Registers every immediate subdirectory of base_dir that has a manifest.json."""
+        roots = {
+            entry.name: entry.path for entry in os.scandir(base_dir)
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, 'manifest.json'))
+        }
+        return cls(roots, **kwargs)
+
+    def start(self):
+        self.refresh()
+        if self._watcher is None and self.refresh_interval > 0:
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, name="safecore-compliance-watch", daemon=True)
+            self._watcher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def refresh(self):
+        """Validates all manifests in parallel (each one is skipped if unchanged)."""
+        if not self.validators:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=min(8, len(self.validators)),
+                                            thread_name_prefix="safecore-compliance")
+        results = dict(zip(self.validators, self._pool.map(lambda v: v.validate(), self.validators.values())))
+        # Swap the whole dict so lock-free readers always see a complete snapshot
+        self._results = results
+
+    def get(self, name: str) -> dict:
+        return self._results.get(name, {"valid": False, "error": f"Unknown core: {name}"})
+
+    def is_compliant(self, name: str = None) -> bool:
+        """One core, or all registered cores when name is None."""
+        if name is not None:
+            return self.get(name)["valid"]
+        return bool(self._results) and all(result["valid"] for result in self._results.values())
+
+    def snapshot(self) -> dict:
+        return dict(self._results)
+
+    def _watch(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[SafeCore] Compliance refresh failed: {str(e)}")
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
@@ -1,7 +1,30 @@
 import hashlib
+import io
 import json
 import os
+import struct
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# Binary envelope (v2), for large payloads such as wound photos:
+#   header: MAGIC | version (1) | chunk_size (4, BE) | salt (16) | nonce_prefix (7)
+#   frames: ciphertext_len (4, BE) | ciphertext + 16-byte tag, one per chunk
+# Every envelope is sealed with its own subkey, HKDF-SHA256(key, salt), so
+# the prefix/counter nonces only have to be unique within one envelope
+# (same construction as Tink's streaming AEAD). Chunk i uses
+# nonce = nonce_prefix | i (4, BE) | final flag (1) and the header as
+# associated data, so chunks cannot be reordered, dropped or truncated
+# without failing authentication.
+ENVELOPE_MAGIC = b"SCE1"
+ENVELOPE_VERSION = 2
+ENVELOPE_SALT_SIZE = 16
+ENVELOPE_KDF_INFO = b"safecore-envelope-v2"
+ENVELOPE_HEADER = struct.Struct(">4sBI16s7s")
+ENVELOPE_FRAME = struct.Struct(">I")
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+TAG_SIZE = 16
 
 class SafeEncryption:
     def __init__(self, client_secret=None):
@@ -11,18 +34,23 @@ class SafeEncryption:
         
         # Match JS: key = crypto.createHash('sha256').update(secret).digest()
         self.key = hashlib.sha256(secret.encode()).digest()
+        # AESGCM objects are reusable; build it once instead of per call
+        self._aesgcm = AESGCM(self.key)
 
     def encrypt(self, payload: dict) -> dict:
-        aesgcm = AESGCM(self.key)
-        iv = os.urandom(12) # GCM standard IV is 12 bytes
+        return self.encrypt_raw(json.dumps(payload, separators=(',', ':')).encode())
+
+    def encrypt_raw(self, data_json: bytes) -> dict:
+        """
+        Same as encrypt() for an already serialized JSON body.
+        """
+        aesgcm = self._aesgcm
         # Note: Previous Node.js implementation used 16 bytes for IV, 
         # but GCM usually expects 12. Let's stick to what Node.js did (16 bytes randomBytes)
         # Re-checking Node code: const iv = crypto.randomBytes(16);
         # So we MUST use 16 bytes IV to be compatible.
         iv = os.urandom(16)
         
-        data_json = json.dumps(payload, separators=(',', ':')).encode()
-        
         # cryptography library handles the auth tag by appending it to the ciphertext
         ciphertext_with_tag = aesgcm.encrypt(iv, data_json, None)
         
@@ -37,14 +65,119 @@ class SafeEncryption:
         }
 
     def decrypt(self, encrypted_payload: dict) -> dict:
+        decrypted_data = self.decrypt_raw(encrypted_payload)
+        try:
+            return json.loads(decrypted_data.decode())
+        except Exception as e:
+            raise ValueError(f"Decryption failed: {str(e)}")
+
+    def decrypt_raw(self, encrypted_payload: dict) -> bytes:
+        """
+        Same as decrypt() but returns the plaintext JSON bytes without parsing them.
+        """
         try:
             iv = bytes.fromhex(encrypted_payload['iv'])
             data = bytes.fromhex(encrypted_payload['data'])
             tag = bytes.fromhex(encrypted_payload['tag'])
             
-            aesgcm = AESGCM(self.key)
-            decrypted_data = aesgcm.decrypt(iv, data + tag, None)
-            
-            return json.loads(decrypted_data.decode())
+            return self._aesgcm.decrypt(iv, data + tag, None)
         except Exception as e:
             raise ValueError(f"Decryption failed: {str(e)}")
+
+    # --- Binary chunked envelope (Python-only; the hex/JSON format above stays for the JS SDK) ---
+
+    def encrypt_bytes(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+        out = io.BytesIO()
+        self.encrypt_stream(io.BytesIO(data), out, chunk_size)
+        return out.getvalue()
+
+    def decrypt_bytes(self, envelope: bytes) -> bytes:
+        out = io.BytesIO()
+        self.decrypt_stream(io.BytesIO(envelope), out)
+        return out.getvalue()
+
+    def encrypt_stream(self, reader, writer, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        Encrypts a binary file-like `reader` into `writer` chunk by chunk.
+        Memory use is bounded by chunk_size. Returns bytes written.
+        """
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}")
+        salt, nonce_prefix = os.urandom(ENVELOPE_SALT_SIZE), os.urandom(7)
+        header = ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION, chunk_size, salt, nonce_prefix)
+        aesgcm = self._envelope_cipher(salt)
+        written = writer.write(header) or len(header)
+
+        index = 0
+        chunk = _read_exactly(reader, chunk_size)
+        while True:
+            # Look one chunk ahead so the last frame can carry the final flag
+            following = _read_exactly(reader, chunk_size) if len(chunk) == chunk_size else b""
+            final = not following
+            sealed = aesgcm.encrypt(_chunk_nonce(nonce_prefix, index, final), chunk, header)
+            frame = ENVELOPE_FRAME.pack(len(sealed))
+            written += (writer.write(frame) or len(frame)) + (writer.write(sealed) or len(sealed))
+            if final:
+                return written
+            chunk = following
+            index += 1
+
+    def decrypt_stream(self, reader, writer) -> int:
+        """
+        Decrypts an envelope from `reader` into `writer`. Each chunk is
+        authenticated before any of its plaintext is written. Returns plaintext bytes written.
+        """
+        try:
+            header = _read_exactly(reader, ENVELOPE_HEADER.size)
+            if len(header) < ENVELOPE_HEADER.size:
+                raise ValueError("Truncated envelope")
+            magic, version, chunk_size, salt, nonce_prefix = ENVELOPE_HEADER.unpack(header)
+            if magic != ENVELOPE_MAGIC or version != ENVELOPE_VERSION:
+                raise ValueError("Not a SafeCore envelope")
+            if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+                raise ValueError("Invalid chunk size")
+            aesgcm = self._envelope_cipher(salt)
+
+            written = 0
+            index = 0
+            frame = _read_exactly(reader, ENVELOPE_FRAME.size)
+            while True:
+                if len(frame) < ENVELOPE_FRAME.size:
+                    raise ValueError("Truncated envelope")
+                (sealed_len,) = ENVELOPE_FRAME.unpack(frame)
+                if not TAG_SIZE <= sealed_len <= chunk_size + TAG_SIZE:
+                    raise ValueError("Invalid frame length")
+                sealed = _read_exactly(reader, sealed_len)
+                if len(sealed) < sealed_len:
+                    raise ValueError("Truncated envelope")
+
+                # Reading the next frame header tells us whether this chunk must be the final one
+                frame = _read_exactly(reader, ENVELOPE_FRAME.size)
+                final = not frame
+                plaintext = aesgcm.decrypt(_chunk_nonce(nonce_prefix, index, final), sealed, header)
+                writer.write(plaintext)
+                written += len(plaintext)
+                if final:
+                    return written
+                index += 1
+        except Exception as e:
+            raise ValueError(f"Decryption failed: {str(e) or type(e).__name__}")
+
+    def _envelope_cipher(self, salt: bytes) -> AESGCM:
+        subkey = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=ENVELOPE_KDF_INFO).derive(self.key)
+        return AESGCM(subkey)
+
+
+def _chunk_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, 1 if final else 0)
+
+
+def _read_exactly(reader, size: int) -> bytes:
+    data = reader.read(size)
+    while data and len(data) < size:
+        more = reader.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
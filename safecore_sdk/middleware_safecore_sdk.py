@@ -1,6 +1,8 @@
 from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.base import BaseHTTPMiddleware
 from .encryption import SafeEncryption
+import asyncio
 import json
 import os
 
@@ -34,3 +36,213 @@ class PhoenixDecryptionMiddleware(BaseHTTPMiddleware):
         except Exception as e:
             print(f"[SafeCore] Decryption Failed: {str(e)}")
             return Response(content=json.dumps({"error": "Decryption Failed"}), status_code=403, media_type="application/json")
+
+
+ENVELOPE_CONTENT_TYPE = "application/vnd.safecore.envelope"
+# Content type of the plaintext inside an encrypted request/response (default: JSON)
+INNER_CONTENT_TYPE_HEADER = "x-safecore-content-type"
+# Streamed responses are encrypted record by record instead of buffered
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+SSE_CONTENT_TYPE = "text/event-stream"
+# Bodies above this size are decrypted/encrypted in a worker thread so the event loop stays free
+OFFLOAD_THRESHOLD_BYTES = int(os.getenv("SAFECORE_OFFLOAD_THRESHOLD", str(64 * 1024)))
+
+
+class SafeCoreDecryptionMiddleware:
+    """
+    Pure ASGI replacement for PhoenixDecryptionMiddleware.
+
+    - The SafeEncryption key is derived once, not per request.
+    - The decrypted body is re-injected as the request body (with a matching
+      content-length), so routes such as /api/analyze_wound read it as usual.
+      Its content type comes from x-safecore-content-type (JSON when absent),
+      so an encrypted NDJSON batch still reaches the route as NDJSON.
+    - Large bodies are decrypted in a worker thread.
+    - Accepts the hex/JSON format of the JS SDK and the binary envelope
+      (Content-Type: application/vnd.safecore.envelope).
+    - Opt-in (encrypt_responses / SAFECORE_ENCRYPT_RESPONSES=true): every
+      response to an encrypted request is encrypted with the same key, in the
+      format the client used (or the envelope if it Accepts it), with the
+      original type in x-safecore-content-type. NDJSON and SSE streams keep
+      streaming: each line / each event's data is sealed as a hex/JSON object.
+    """
+
+    def __init__(self, app, client_secret=None, offload_threshold: int = OFFLOAD_THRESHOLD_BYTES,
+                 enforce: bool = None, encrypt_responses: bool = None):
+        self.app = app
+        self.encryption = SafeEncryption(client_secret)
+        self.offload_threshold = offload_threshold
+        self.enforce = os.getenv('ENFORCE_ENCRYPTION') == 'true' if enforce is None else enforce
+        self.encrypt_responses = (os.getenv('SAFECORE_ENCRYPT_RESPONSES') == 'true'
+                                  if encrypt_responses is None else encrypt_responses)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        # 1. Check if request is encrypted
+        if headers.get('x-safecore-encrypted') != 'true':
+            if self.enforce and scope["method"] != 'GET':
+                return await _json_error("Encryption Required")(scope, receive, send)
+            return await self.app(scope, receive, send)
+
+        # 2. Process Encrypted Payload
+        try:
+            body = await _read_body(receive)
+            content_type = headers.get('content-type', '')
+            if len(body) > self.offload_threshold:
+                plaintext = await asyncio.to_thread(self._decrypt, body, content_type)
+            else:
+                plaintext = self._decrypt(body, content_type)
+        except Exception as e:
+            print(f"[SafeCore] Decryption Failed: {str(e)}")
+            return await _json_error("Decryption Failed")(scope, receive, send)
+
+        scope = dict(scope)
+        request_headers = MutableHeaders(scope=scope)
+        request_headers['content-type'] = headers.get(INNER_CONTENT_TYPE_HEADER, 'application/json')
+        del request_headers[INNER_CONTENT_TYPE_HEADER]
+        request_headers['content-length'] = str(len(plaintext))
+        scope["state"] = {**scope.get("state", {}), "is_encrypted": True}
+
+        if self.encrypt_responses:
+            use_envelope = (content_type.startswith(ENVELOPE_CONTENT_TYPE)
+                            or ENVELOPE_CONTENT_TYPE in headers.get('accept', ''))
+            send = self._encrypting_send(send, use_envelope)
+        await self.app(scope, _replay_body(plaintext, receive), send)
+
+    def _encrypting_send(self, send, use_envelope: bool):
+        """
+        Wraps `send` to encrypt the response. NDJSON/SSE bodies are sealed
+        record by record as they stream; anything else is buffered, encrypted
+        whole and sent with rewritten headers. Only bodiless responses
+        (1xx/204/304) are forwarded untouched.
+        """
+        start_message = None
+        sealer = None
+        chunks = []
+
+        async def encrypting_send(message):
+            nonlocal start_message, sealer
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if status < 200 or status in (204, 304):
+                    start_message = False  # pass-through mode
+                    return await send(message)
+                response_headers = MutableHeaders(raw=list(message.get("headers", [])))
+                content_type = response_headers.get("content-type", "")
+                if content_type.startswith(NDJSON_CONTENT_TYPES + (SSE_CONTENT_TYPE,)):
+                    sealer = _StreamSealer(self.encryption, sse=content_type.startswith(SSE_CONTENT_TYPE))
+                    if "content-length" in response_headers:
+                        del response_headers["content-length"]
+                    response_headers["x-safecore-encrypted"] = "true"
+                    return await send({**message, "headers": response_headers.raw})
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is False:
+                return await send(message)
+            if sealer is not None:
+                more_body = message.get("more_body", False)
+                sealed = sealer.feed(message.get("body", b""), final=not more_body)
+                if sealed or not more_body:
+                    await send({"type": "http.response.body", "body": sealed, "more_body": more_body})
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if len(body) > self.offload_threshold:
+                sealed, media_type = await asyncio.to_thread(self._encrypt, body, use_envelope)
+            else:
+                sealed, media_type = self._encrypt(body, use_envelope)
+
+            response_headers = MutableHeaders(raw=list(start_message.get("headers", [])))
+            if "content-type" in response_headers:
+                response_headers[INNER_CONTENT_TYPE_HEADER] = response_headers["content-type"]
+            response_headers["content-type"] = media_type
+            response_headers["content-length"] = str(len(sealed))
+            response_headers["x-safecore-encrypted"] = "true"
+            await send({**start_message, "headers": response_headers.raw})
+            await send({"type": "http.response.body", "body": sealed, "more_body": False})
+
+        return encrypting_send
+
+    def _encrypt(self, body: bytes, use_envelope: bool):
+        if use_envelope:
+            return self.encryption.encrypt_bytes(body), ENVELOPE_CONTENT_TYPE
+        return json.dumps(self.encryption.encrypt_raw(body), separators=(',', ':')).encode(), "application/json"
+
+    def _decrypt(self, body: bytes, content_type: str) -> bytes:
+        if content_type.startswith(ENVELOPE_CONTENT_TYPE):
+            return self.encryption.decrypt_bytes(body)
+        return self.encryption.decrypt_raw(json.loads(body))
+
+
+class _StreamSealer:
+    """
+    Encrypts a streamed body record by record: NDJSON lines become one
+    hex/JSON object per line; SSE events keep their event/id fields and carry
+    their data as one sealed hex/JSON object. A partial record waits for the
+    rest of it in the next chunk.
+    """
+
+    def __init__(self, encryption: SafeEncryption, sse: bool):
+        self.encryption = encryption
+        self.sse = sse
+        self.separator = b"\n\n" if sse else b"\n"
+        self.buffer = b""
+
+    def feed(self, data: bytes, final: bool) -> bytes:
+        *records, self.buffer = (self.buffer + data).split(self.separator)
+        if final:
+            records.append(self.buffer)
+            self.buffer = b""
+        return b"".join(self._seal(record) + self.separator for record in records if record.strip())
+
+    def _seal(self, record: bytes) -> bytes:
+        if not self.sse:
+            return self._sealed_json(record)
+        fields, data = [], []
+        for line in record.split(b"\n"):
+            if line.startswith(b"data:"):
+                value = line[5:]
+                data.append(value[1:] if value.startswith(b" ") else value)
+            else:
+                fields.append(line)  # event:, id:, retry: and comments carry no payload
+        if data:
+            fields.append(b"data: " + self._sealed_json(b"\n".join(data)))
+        return b"\n".join(fields)
+
+    def _sealed_json(self, plaintext: bytes) -> bytes:
+        return json.dumps(self.encryption.encrypt_raw(plaintext), separators=(',', ':')).encode()
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ConnectionError("Client disconnected while sending the body")
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive):
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # After the body, defer to the server (e.g. for http.disconnect)
+        return await receive()
+
+    return replay
+
+
+def _json_error(message: str) -> Response:
+    return Response(content=json.dumps({"error": message}), status_code=403, media_type="application/json")
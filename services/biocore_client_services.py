@@ -1,25 +1,38 @@
 import httpx
+import logging
 import os
 
+from services.resilience import get_upstream
+
+logger = logging.getLogger(__name__)
+
 BIOCORE_URL = os.getenv("BIOCORE_URL", "http://localhost:3001")
+BIOCORE_TIMEOUT_S = float(os.getenv("BIOCORE_TIMEOUT", "10"))
 
 class BioCoreClient:
+    def __init__(self):
+        self.upstream = get_upstream("biocore", timeout=BIOCORE_TIMEOUT_S)
+
     async def authenticate_biometric(self, user_id: str, biometric_data: str, liveness: bool = True):
         """
         Delegates biometric authentication to BioCore.
         """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{BIOCORE_URL}/api/auth/bio",
-                    json={
-                        "userId": user_id,
-                        "biometricData": biometric_data,
-                        "livenessVerified": liveness
-                    }
-                )
-                response.raise_for_status()
+            async with httpx.AsyncClient(timeout=BIOCORE_TIMEOUT_S) as client:
+                async def post():
+                    response = await client.post(
+                        f"{BIOCORE_URL}/api/auth/bio",
+                        json={
+                            "userId": user_id,
+                            "biometricData": biometric_data,
+                            "livenessVerified": liveness
+                        }
+                    )
+                    response.raise_for_status()
+                    return response
+
+                response = await self.upstream.call(post, operation="authenticate_biometric")
                 return response.json()
         except Exception as e:
-            print(f"[BioCore] Authentication failed: {e}")
+            logger.warning("BioCore authentication failed: %s", e)
             raise e
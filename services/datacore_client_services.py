@@ -1,17 +1,147 @@
+import asyncio
 import httpx
 import os
 import json
+import itertools
+import logging
+import time
+from collections import OrderedDict
+
+from services.resilience import get_upstream
+
+logger = logging.getLogger(__name__)
 
 DATACORE_URL = os.getenv("DATACORE_URL", "http://localhost:4000")
+DATACORE_BULK_PATH = os.getenv("DATACORE_BULK_PATH", "/api/data/ingest/bulk")
+DATACORE_TIMEOUT_S = float(os.getenv("DATACORE_TIMEOUT", "10"))
+DATACORE_MAX_CONNECTIONS = int(os.getenv("DATACORE_MAX_CONNECTIONS", "50"))
+DATACORE_MAX_KEEPALIVE = int(os.getenv("DATACORE_MAX_KEEPALIVE", "10"))
+
+# Write-behind ingestion: flush when a batch is full or its oldest record waited this long
+INGEST_BATCH_SIZE = int(os.getenv("DATACORE_INGEST_BATCH_SIZE", "100"))
+INGEST_MAX_LATENCY_S = float(os.getenv("DATACORE_INGEST_MAX_LATENCY_MS", "50")) / 1000
+INGEST_QUEUE_SIZE = int(os.getenv("DATACORE_INGEST_QUEUE_SIZE", "1000"))
+
+# Read-through cache for retrieve_clinical_data (PHI: optionally encrypted in memory)
+RECORD_CACHE_MAX_ENTRIES = int(os.getenv("DATACORE_CACHE_MAX_ENTRIES", "512"))
+RECORD_CACHE_TTL_S = float(os.getenv("DATACORE_CACHE_TTL", "60"))
+RECORD_CACHE_ENCRYPT = os.getenv("DATACORE_CACHE_ENCRYPT", "false").lower() in ("1", "true", "yes")
+
+_BULK_UNSUPPORTED = (404, 405, 501)
+
+
+class ClinicalRecordCache:
+    """
+    Bounded LRU of retrieved records with a TTL. Entries hold the serialized
+    record (AES-GCM encrypted with the SafeCore key when encrypt=True) plus
+    the ETag DataCore sent, so an expired entry can be revalidated with
+    If-None-Match instead of downloaded again. Every hit decodes a fresh
+    copy, so callers can't mutate the cached record.
+    """
+
+    def __init__(self, max_entries: int = RECORD_CACHE_MAX_ENTRIES, ttl: float = RECORD_CACHE_TTL_S,
+                 encrypt: bool = RECORD_CACHE_ENCRYPT, client_secret: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._cipher = None
+        if encrypt:
+            from safecore_sdk.encryption import SafeEncryption
+            self._cipher = SafeEncryption(client_secret)
+        self._entries: OrderedDict = OrderedDict()  # record_id -> (expires_at, etag, blob)
+        # record_id -> id of its last write; forgotten ids report the newest
+        # forgotten value, so an old in-flight read still sees them as changed
+        self._generations: OrderedDict = OrderedDict()
+        self._write_ids = itertools.count(1)
+        self._forgotten_generation = 0
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "invalidations": 0}
+
+    def lookup(self, record_id: str):
+        """Returns (fresh, etag, record) or None when nothing is cached."""
+        entry = self._entries.get(record_id)
+        if entry is None:
+            return None
+        expires_at, etag, blob = entry
+        fresh = time.monotonic() < expires_at
+        if not fresh and etag is None:
+            del self._entries[record_id]
+            return None
+        self._entries.move_to_end(record_id)
+        return fresh, etag, self._decode(blob)
+
+    def store(self, record_id: str, record, etag: str = None, generation: int = None):
+        # A write to the record since the read started makes this copy stale
+        if generation is not None and generation != self.generation(record_id):
+            return
+        self._entries[record_id] = (time.monotonic() + self.ttl, etag, self._encode(record))
+        self._entries.move_to_end(record_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def touch(self, record_id: str):
+        """Extends an entry after a 304 Not Modified."""
+        entry = self._entries.get(record_id)
+        if entry is not None:
+            self._entries[record_id] = (time.monotonic() + self.ttl,) + entry[1:]
+
+    def invalidate(self, record_id: str):
+        self._generations[record_id] = next(self._write_ids)
+        self._generations.move_to_end(record_id)
+        while len(self._generations) > 4 * self.max_entries:
+            self._forgotten_generation = self._generations.popitem(last=False)[1]
+        if self._entries.pop(record_id, None) is not None:
+            self.stats["invalidations"] += 1
+
+    def generation(self, record_id: str) -> int:
+        return self._generations.get(record_id, self._forgotten_generation)
+
+    def clear(self):
+        self._entries.clear()
+
+    def hit_ratio(self) -> float:
+        served = self.stats["hits"] + self.stats["revalidated"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def _encode(self, record) -> bytes:
+        blob = json.dumps(record, separators=(",", ":")).encode()
+        return self._cipher.encrypt_bytes(blob) if self._cipher else blob
+
+    def _decode(self, blob: bytes):
+        return json.loads(self._cipher.decrypt_bytes(blob) if self._cipher else blob)
+
 
 class DataCoreClient:
+    def __init__(self, http_client: httpx.AsyncClient = None, cache: ClinicalRecordCache = None):
+        # One pooled client per DataCoreClient, opened on first use
+        self._http = http_client
+        self._bulk_supported = True
+        self.cache = cache if cache is not None else ClinicalRecordCache()
+        self.upstream = get_upstream("datacore", timeout=DATACORE_TIMEOUT_S)
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=DATACORE_TIMEOUT_S,
+                limits=httpx.Limits(
+                    max_connections=DATACORE_MAX_CONNECTIONS,
+                    max_keepalive_connections=DATACORE_MAX_KEEPALIVE
+                )
+            )
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     async def ingest_clinical_data(self, record_id: str, payload: dict):
         """
         Sends clinical data to DataCore for secure storage.
         """
+        self.cache.invalidate(record_id)
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
+            async def post():
+                response = await self._client().post(
                     f"{DATACORE_URL}/api/data/ingest",
                     json={
                         "schema": "clinical_record", # defined in DataCore logic
@@ -20,22 +150,192 @@ class DataCoreClient:
                     }
                 )
                 response.raise_for_status()
-                return response.json()
+                return response
+
+            response = await self.upstream.call(post, operation="ingest")
+            # Again once stored: a read that raced the write may have cached the old version
+            self.cache.invalidate(record_id)
+            return response.json()
         except Exception as e:
-            print(f"[DataCore] Ingestion failed: {e}")
+            logger.warning("DataCore ingestion failed: %s", e)
             raise e
 
+    async def ingest_many(self, records: list):
+        """
+        Sends [(record_id, payload), ...] in one bulk request and returns one
+        result per record, in order. Falls back to concurrent single ingests
+        over the pooled client if DataCore has no bulk endpoint, or if its
+        bulk answer does not say what happened to each record (ingest is
+        keyed by record id, so re-sending is safe).
+        """
+        for record_id, _ in records:
+            self.cache.invalidate(record_id)
+        if self._bulk_supported:
+            try:
+                async def post():
+                    response = await self._client().post(
+                        f"{DATACORE_URL}{DATACORE_BULK_PATH}",
+                        json={
+                            "schema": "clinical_record",
+                            "records": [{"id": record_id, "payload": payload} for record_id, payload in records]
+                        }
+                    )
+                    if response.status_code >= 500 and response.status_code not in _BULK_UNSUPPORTED:
+                        response.raise_for_status()
+                    return response
+
+                response = await self.upstream.call(post, operation="ingest_bulk")
+                if response.status_code in _BULK_UNSUPPORTED:
+                    logger.info("DataCore bulk ingestion not available, falling back to single requests")
+                    self._bulk_supported = False
+                else:
+                    response.raise_for_status()
+                    for record_id, _ in records:
+                        self.cache.invalidate(record_id)
+                    body = response.json()
+                    results = body.get("results") if isinstance(body, dict) else None
+                    if isinstance(results, list) and len(results) == len(records):
+                        return results
+                    # Outcome unknown per record: not reported as success
+                    logger.warning("DataCore bulk response without per-record results, re-sending records one by one")
+            except Exception as e:
+                logger.warning("DataCore bulk ingestion failed: %s", e)
+                raise e
+        return await asyncio.gather(
+            *(self.ingest_clinical_data(record_id, payload) for record_id, payload in records),
+            return_exceptions=True
+        )
+
     async def retrieve_clinical_data(self, record_id: str):
         """
         Retrieves clinical data from DataCore.
+        Fresh cache hits return without any network call; expired entries
+        with an ETag are revalidated with If-None-Match.
         """
+        cached = self.cache.lookup(record_id)
+        if cached is not None and cached[0]:
+            self.cache.stats["hits"] += 1
+            return cached[2]
+        headers = {"If-None-Match": cached[1]} if cached is not None else {}
+        generation = self.cache.generation(record_id)
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{DATACORE_URL}/api/data/retrieve/{record_id}")
-                if response.status_code == 404:
-                    return None
-                response.raise_for_status()
-                return response.json()
+            async def get():
+                response = await self._client().get(f"{DATACORE_URL}/api/data/retrieve/{record_id}", headers=headers)
+                if response.status_code >= 500:
+                    response.raise_for_status()
+                return response
+
+            response = await self.upstream.call(get, idempotent=True, operation="retrieve")
+            if response.status_code == 304 and cached is not None:
+                self.cache.stats["revalidated"] += 1
+                self.cache.touch(record_id)
+                return cached[2]
+            self.cache.stats["misses"] += 1
+            if response.status_code == 404:
+                self.cache.invalidate(record_id)
+                return None
+            response.raise_for_status()
+            record = response.json()
+            self.cache.store(record_id, record, response.headers.get("etag"), generation)
+            return record
         except Exception as e:
-            print(f"[DataCore] Retrieval failed: {e}")
+            logger.warning("DataCore retrieval failed: %s", e)
             raise e
+
+
+class DataCoreIngestionQueue:
+    """
+    Write-behind ingestion in front of DataCoreClient.
+
+    submit() enqueues a record and returns a future for its acknowledgement.
+    A background worker groups records into bulk requests, flushing when
+    INGEST_BATCH_SIZE records are waiting or the oldest has waited
+    INGEST_MAX_LATENCY_S. The queue is bounded: when it is full submit()
+    waits, so a bulk import is throttled to DataCore's pace. close() flushes
+    everything already accepted before returning.
+    """
+
+    def __init__(self, client: DataCoreClient = None, batch_size: int = INGEST_BATCH_SIZE,
+                 max_latency: float = INGEST_MAX_LATENCY_S, max_pending: int = INGEST_QUEUE_SIZE):
+        self._owns_client = client is None
+        self.client = client or DataCoreClient()
+        self.batch_size = max(1, batch_size)
+        self.max_latency = max_latency
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+        self._worker = None
+        self._closing = False
+        self.stats = {"submitted": 0, "acknowledged": 0, "failed": 0, "batches": 0}
+
+    def start(self):
+        if self._worker is None:
+            self._closing = False
+            self._worker = asyncio.create_task(self._run())
+        return self
+
+    async def submit(self, record_id: str, payload: dict) -> asyncio.Future:
+        """Enqueues one record (waits while the queue is full)."""
+        if self._closing:
+            raise RuntimeError("DataCore ingestion queue is closed")
+        self.start()
+        ack = asyncio.get_running_loop().create_future()
+        await self._queue.put((record_id, payload, ack))
+        self.stats["submitted"] += 1
+        return ack
+
+    async def ingest(self, record_id: str, payload: dict):
+        """Enqueues one record and waits for DataCore's acknowledgement."""
+        return await (await self.submit(record_id, payload))
+
+    async def close(self):
+        """Stops accepting records and flushes the ones already queued."""
+        self._closing = True
+        if self._worker is not None:
+            await self._queue.put(None)
+            await self._worker
+            self._worker = None
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = asyncio.get_running_loop().time() + self.max_latency
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                try:
+                    item = self._queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+        # Drain anything that raced in behind the close marker
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start:start + self.batch_size])
+
+    async def _flush(self, batch: list):
+        self.stats["batches"] += 1
+        try:
+            results = await self.client.ingest_many([(record_id, payload) for record_id, payload, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, _, ack), result in zip(batch, results):
+            if ack.done():
+                continue
+            if isinstance(result, Exception):
+                self.stats["failed"] += 1
+                ack.set_exception(result)
+            else:
+                self.stats["acknowledged"] += 1
+                ack.set_result(result)
@@ -0,0 +1,309 @@
+"""
+Phoenix Core - Resiliencia de llamadas salientes
+Circuit breaker por upstream, hedging de lecturas idempotentes según p95,
+presupuesto de reintentos y reporte estructurado de fallos, compartidos por
+todos los clientes de cores (BioCore, DataCore, SafeCore, Med-Gemma, propuestas).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+FAILURE_THRESHOLD = int(os.getenv("RESILIENCE_FAILURE_THRESHOLD", "5"))
+RESET_TIMEOUT_S = float(os.getenv("RESILIENCE_RESET_TIMEOUT", "30"))
+RETRY_BUDGET_RATIO = float(os.getenv("RESILIENCE_RETRY_RATIO", "0.2"))
+RETRY_BUDGET_MAX = float(os.getenv("RESILIENCE_RETRY_BUDGET_MAX", "10"))
+MAX_ATTEMPTS = int(os.getenv("RESILIENCE_MAX_ATTEMPTS", "2"))
+HEDGE_MIN_DELAY_S = float(os.getenv("RESILIENCE_HEDGE_MIN_DELAY_MS", "20")) / 1000
+LATENCY_WINDOW = 256
+LATENCY_MIN_SAMPLES = 20
+RECENT_FAILURES = 50
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised without calling the upstream (open circuit)."""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(f"{upstream} unavailable: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds; then lets one probe through (half-open)
+    and closes again if it succeeds. The probe is identified by the permit
+    allow() returned, so only its owner can release it.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT_S):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe = None  # permit of the half-open probe in flight
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        A truthy permit if the call may proceed, False if rejected. In
+        half-open state the single probe gets a unique permit object.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probe = None
+            if self.state == HALF_OPEN and self._probe is None:
+                self._probe = object()
+                return self._probe
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self._probe = CLOSED, 0, None
+
+    def release_probe(self, permit):
+        """
+        Lets the next call probe when this caller's probe ended without an
+        outcome (e.g. cancelled). No-op for any other permit, so a call can
+        never free a probe it doesn't own.
+        """
+        with self._lock:
+            if permit is not None and permit is self._probe:
+                self._probe = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state, self._opened_at, self._probe = OPEN, time.monotonic(), None
+
+
+class RetryBudget:
+    """
+    Token bucket for retries and hedges: every first attempt deposits
+    `ratio` tokens, every extra attempt spends one. Extra load on a
+    struggling upstream is therefore capped at ~ratio of normal traffic.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, max_tokens: float = RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Upstream:
+    """
+    Resilience policy for one upstream service.
+
+    call() wraps one request (a zero-argument coroutine factory):
+    - fails fast with UpstreamUnavailable while the circuit is open;
+    - bounds every attempt with `timeout`;
+    - for idempotent reads, starts a hedged duplicate once the first attempt
+      has run longer than the observed p95, and retries failures, both only
+      while the retry budget allows;
+    - reports every failure as a structured event.
+    Client errors (HTTP 4xx) are the caller's problem: they are re-raised
+    without retrying and count as a healthy answer for the circuit.
+    """
+
+    def __init__(self, name: str, timeout: float = 10.0, max_attempts: int = MAX_ATTEMPTS,
+                 breaker: CircuitBreaker = None, budget: RetryBudget = None):
+        self.name = name
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.breaker = breaker or CircuitBreaker()
+        self.budget = budget or RetryBudget()
+        self.latency = LatencyTracker()
+        self.recent_failures = deque(maxlen=RECENT_FAILURES)
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], idempotent: bool = False, operation: str = "") -> Any:
+        self.stats["calls"] += 1
+        self.budget.deposit()
+        attempt = 1
+        while True:
+            permit = self.breaker.allow()
+            if not permit:
+                self.stats["rejected"] += 1
+                self._report(operation, attempt, "circuit_open", None)
+                raise UpstreamUnavailable(self.name, "circuit open")
+            try:
+                if idempotent:
+                    return await self._hedged(fn, operation)
+                return await self._attempt(fn)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not _is_upstream_failure(e):
+                    # The upstream answered: as far as the circuit is concerned it is up
+                    self.breaker.record_success()
+                    raise
+                self._record_failure(operation, attempt, e)
+                if not idempotent or attempt >= self.max_attempts or not self.budget.withdraw():
+                    raise
+                self.stats["retries"] += 1
+                attempt += 1
+            finally:
+                # No-op once an outcome was recorded; frees our half-open probe if it was cancelled
+                self.breaker.release_probe(permit)
+
+    def call_sync(self, fn: Callable[[], Any], operation: str = "") -> Any:
+        """Blocking variant for sync clients: circuit breaker and reporting only."""
+        self.stats["calls"] += 1
+        permit = self.breaker.allow()
+        if not permit:
+            self.stats["rejected"] += 1
+            self._report(operation, 1, "circuit_open", None)
+            raise UpstreamUnavailable(self.name, "circuit open")
+        started = time.monotonic()
+        try:
+            result = fn()
+            self._record_success(time.monotonic() - started)
+            return result
+        except Exception as e:
+            if _is_upstream_failure(e):
+                self._record_failure(operation, 1, e)
+            else:
+                self.breaker.record_success()
+            raise
+        finally:
+            self.breaker.release_probe(permit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.latency.percentile(0.95)
+        return {
+            **self.stats,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retry_tokens": round(self.budget.tokens, 2),
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "recent_failures": list(self.recent_failures),
+        }
+
+    async def _attempt(self, fn):
+        started = time.monotonic()
+        result = await asyncio.wait_for(fn(), self.timeout)
+        self._record_success(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, fn, operation: str):
+        p95 = self.latency.percentile(0.95)
+        primary = asyncio.ensure_future(self._attempt(fn))
+        tasks = [primary]
+        try:
+            if p95 is None:
+                return await primary
+            delay = max(HEDGE_MIN_DELAY_S, p95)
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.budget.withdraw():
+                return await primary
+
+            self.stats["hedges"] += 1
+            hedge = asyncio.ensure_future(self._attempt(fn))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+                    if _is_upstream_failure(error) and pending:
+                        self._record_failure(operation, 1, error)
+            raise error
+        finally:
+            # The losing attempt, or every attempt if the caller was cancelled (even during the hedge delay)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def _record_success(self, seconds: float):
+        self.latency.record(seconds)
+        self.breaker.record_success()
+
+    def _record_failure(self, operation: str, attempt: int, error: Exception):
+        self.stats["failures"] += 1
+        self.breaker.record_failure()
+        kind = "timeout" if isinstance(error, asyncio.TimeoutError) else type(error).__name__
+        self._report(operation, attempt, kind, error)
+
+    def _report(self, operation: str, attempt: int, kind: str, error: Optional[Exception]):
+        event = {
+            "upstream": self.name,
+            "operation": operation,
+            "attempt": attempt,
+            "kind": kind,
+            "error": str(error) if error is not None else None,
+            "circuit": self.breaker.state,
+            "ts": time.time(),
+        }
+        self.recent_failures.append(event)
+        # One JSON object per event, also attached as a record attribute for structured handlers
+        logger.warning(json.dumps(event), extra={"resilience_event": event})
+
+
+_UPSTREAMS: Dict[str, Upstream] = {}
+_UPSTREAMS_LOCK = threading.Lock()
+
+
+def get_upstream(name: str, **kwargs) -> Upstream:
+    """Shared Upstream per name, so every client of a core sees the same circuit."""
+    with _UPSTREAMS_LOCK:
+        if name not in _UPSTREAMS:
+            _UPSTREAMS[name] = Upstream(name, **kwargs)
+        return _UPSTREAMS[name]
+
+
+def resilience_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: upstream.snapshot() for name, upstream in _UPSTREAMS.items()}
+
+
+def _is_upstream_failure(error: Exception) -> bool:
+    # HTTP 4xx responses mean the request was wrong, not that the upstream is degraded
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500)
@@ -1,27 +1,149 @@
+import asyncio
+import base64
+import hashlib
 import httpx
+import json
+import logging
 import os
+import time
+from collections import OrderedDict
+
+from services.resilience import get_upstream
+
+logger = logging.getLogger(__name__)
 
 SAFECORE_URL = os.getenv("SAFECORE_URL", "http://localhost:3000")
+SAFECORE_TIMEOUT_S = float(os.getenv("SAFECORE_TIMEOUT", "5"))
+
+# Verified tokens are trusted until this TTL or their own "exp", whichever is first;
+# rejected tokens are remembered briefly so a bad token can't hammer SafeCore.
+TOKEN_CACHE_TTL_S = float(os.getenv("SAFECORE_TOKEN_CACHE_TTL", "300"))
+TOKEN_NEGATIVE_TTL_S = float(os.getenv("SAFECORE_TOKEN_NEGATIVE_TTL", "10"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("SAFECORE_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+
+class TokenVerificationCache:
+    """
+    LRU of verification results keyed by the token's SHA-256 (raw tokens
+    are never kept). Only definite answers from SafeCore are cached;
+    transport errors are not.
+    """
+
+    def __init__(self, ttl: float = TOKEN_CACHE_TTL_S, negative_ttl: float = TOKEN_NEGATIVE_TTL_S,
+                 max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, result)
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "coalesced": 0}
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def set(self, key: str, token: str, result: dict):
+        ttl = self.ttl if result.get("valid") else self.negative_ttl
+        if result.get("valid"):
+            expires_in = _token_expires_in(token)
+            if expires_in is not None:
+                ttl = min(ttl, expires_in)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        self._entries.pop(self.key(token), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def hit_ratio(self) -> float:
+        served = self.stats["hits"] + self.stats["negative_hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "entries": len(self._entries), "hit_ratio": round(self.hit_ratio(), 4)}
+
 
 class SafeCoreClient:
+    def __init__(self, http_client: httpx.AsyncClient = None, cache: TokenVerificationCache = None):
+        self._http = http_client
+        self.cache = cache if cache is not None else TokenVerificationCache()
+        self._in_flight = {}
+        self.upstream = get_upstream("safecore", timeout=SAFECORE_TIMEOUT_S)
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=SAFECORE_TIMEOUT_S)
+        return self._http
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     async def verify_session(self, token: str):
         """
         Verifies a session token with SafeCore.
+        Cached results are returned without a network call, and concurrent
+        checks of the same token share a single upstream request.
         """
+        key = self.cache.key(token)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.stats["hits" if cached["valid"] else "negative_hits"] += 1
+            return dict(cached)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.cache.stats["coalesced"] += 1
+        else:
+            self.cache.stats["misses"] += 1
+            task = asyncio.ensure_future(self._verify_upstream(key, token))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: one caller giving up must not cancel the check for the others
+        return dict(await asyncio.shield(task))
+
+    async def _verify_upstream(self, key: str, token: str):
         try:
-            async with httpx.AsyncClient() as client:
-                # Assuming SafeCore has an inspection or auth endpoint.
-                # Based on gateway/server.js, it uses middleware.
-                # We'll hit a health or simple endpoint passing the token to verify access.
-                response = await client.get(
+            # Assuming SafeCore has an inspection or auth endpoint.
+            # Based on gateway/server.js, it uses middleware.
+            # We'll hit a health or simple endpoint passing the token to verify access.
+            async def get():
+                response = await self._client().get(
                     f"{SAFECORE_URL}/health",
                     headers={"Authorization": f"Bearer {token}"}
                 )
-                if response.status_code == 200:
-                    return {"valid": True, "details": response.json()}
-                return {"valid": False}
+                # 5xx is SafeCore failing, not a rejected token: never cache it
+                if response.status_code >= 500:
+                    response.raise_for_status()
+                return response
+
+            response = await self.upstream.call(get, idempotent=True, operation="verify_session")
+            if response.status_code == 200:
+                result = {"valid": True, "details": response.json()}
+            else:
+                result = {"valid": False}
+            self.cache.set(key, token, result)
+            return result
         except Exception as e:
-            print(f"[SafeCore] Error verifying session: {e}")
+            logger.warning("SafeCore session verification failed: %s", e)
             return {"valid": False, "error": str(e)}
 
     async def sanitize_input(self, data: dict):
@@ -32,3 +154,19 @@ class SafeCoreClient:
         """
         # TODO: Implement specific sanitization endpoint if exposed by SafeCore API
         pass
+
+
+def _token_expires_in(token: str):
+    """
+    Seconds until the "exp" claim of a JWT-shaped token, or None. The claim
+    is only used to bound the cache lifetime; SafeCore does the verification.
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        padded = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(padded)).get("exp")
+        return float(exp) - time.time() if exp is not None else None
+    except (ValueError, TypeError, AttributeError):
+        return None
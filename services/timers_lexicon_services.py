@@ -0,0 +1,113 @@
+"""
+Phoenix Core - Léxico TIMERS
+Tabla de términos inglés/español y matcher multi-patrón para clasificar las
+descripciones de Med-Gemma (tejido, exudado, bordes, infección) en una sola
+pasada, por palabras completas y descartando los términos negados.
+Compartido por el backend (WoundAnalyzer) y src/services (WoundHealingEngine).
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, List
+
+# Category -> words and phrases, lowercase and without accents. They match as
+# whole words (a hyphen does not end a word, so "high" does not match
+# "high-quality"), so every inflection that should count is listed: stems
+# matched "secondary" as "seco" and "several" as "sever".
+TIMERS_SYNONYMS: Dict[str, List[str]] = {
+    # T: tejido no viable
+    "tissue_nonviable": [
+        "necrotic", "necrosis", "necrosed", "slough", "sloughy", "sloughing", "eschar", "eschars",
+        "devitalized", "devitalised", "non-viable", "nonviable", "non viable", "fibrin", "fibrinous",
+        "necrotico", "necrotica", "necroticos", "necroticas", "necrosado", "necrosada", "necrosados", "necrosadas",
+        "esfacelo", "esfacelos", "esfacelado", "esfacelada", "esfacelados", "esfaceladas", "escara", "escaras",
+        "desvitalizado", "desvitalizada", "desvitalizados", "desvitalizadas",
+        "fibrina", "fibrinoso", "fibrinosa", "fibrinosos", "fibrinosas", "no viable",
+    ],
+    # I: infección / inflamación significativa (escala cualitativa)
+    "infection_significant": [
+        "moderate", "moderately", "severe", "severely",
+        "moderado", "moderada", "moderados", "moderadas", "severo", "severa", "severos", "severas",
+        "grave", "graves",
+    ],
+    # M: exudado alto / maceración
+    "moisture_high": [
+        "high", "heavy", "heavily", "copious", "abundant", "profuse", "macerated", "maceration",
+        "alto", "alta", "altos", "altas", "elevado", "elevada", "elevados", "elevadas",
+        "abundante", "abundantes", "copioso", "copiosa", "profuso", "profusa",
+        "macerado", "macerada", "macerados", "maceradas", "maceracion",
+    ],
+    # M: lecho seco
+    "moisture_dry": [
+        "dry", "dried", "desiccated", "desiccation",
+        "seco", "seca", "secos", "secas", "desecado", "desecada", "resecado", "resecada", "reseco", "reseca",
+    ],
+    # E: bordes estancados
+    "edges_stalled": [
+        "non-advancing", "non advancing", "not advancing", "undermined", "undermining", "rolled",
+        "epibole", "epibolic",
+        "socavado", "socavada", "socavados", "socavadas", "socavamiento", "socavamientos",
+        "estancado", "estancada", "estancados", "estancadas", "no avanza", "no avanzan",
+        "enrollado", "enrollada", "enrollados", "enrolladas", "epibolia",
+    ],
+}
+
+# A term is ignored when one of the NEGATION_WINDOW words before it, within the
+# same clause, negates it: "sin necrosis", "no slough", "without signs of eschar"
+NEGATIONS = frozenset({"sin", "no", "without", "not", "ni", "nor", "ausencia", "absence"})
+NEGATION_WINDOW = 3
+_CLAUSE_BREAK = re.compile(r"[.,;:!?()\n]")
+_WORD = re.compile(r"[\w-]+")
+
+
+def normalize_text(text) -> str:
+    """Casefolds and strips accents (Granulación -> granulacion). None -> ""."""
+    if not isinstance(text, str):
+        # Assessments may carry None or numeric grades instead of a description
+        text = "" if text is None else str(text)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class TimersMatcher:
+    """
+    Precompiled multi-pattern matcher over TIMERS_SYNONYMS.
+
+    All categories are combined into one regex with a named group per
+    category, so a description is scanned once and every category it mentions
+    is collected in that pass; negated mentions ("sin necrosis") don't count.
+    Results are memoized per description because model output repeats heavily.
+    """
+
+    def __init__(self, synonyms: Dict[str, List[str]] = None):
+        self.synonyms = synonyms or TIMERS_SYNONYMS
+        alternatives = []
+        for category, terms in self.synonyms.items():
+            # Longest terms first so the most specific one wins at a position
+            ordered = sorted({normalize_text(term) for term in terms}, key=len, reverse=True)
+            alternatives.append(f"(?P<{category}>{'|'.join(re.escape(term) for term in ordered)})")
+        self._pattern = re.compile(r"(?<![\w-])(?:" + "|".join(alternatives) + r")(?![\w-])")
+        self._scan_cached = lru_cache(maxsize=4096)(self._scan)
+
+    def scan(self, text) -> FrozenSet[str]:
+        if not isinstance(text, str):
+            # Only strings reach the cache: None/numbers as text, lists are unhashable
+            text = "" if text is None else str(text)
+        return self._scan_cached(text)
+
+    def _scan(self, text: str) -> FrozenSet[str]:
+        normalized = normalize_text(text)
+        return frozenset(match.lastgroup for match in self._pattern.finditer(normalized)
+                         if not _negated(normalized, match.start()))
+
+    def matches(self, text: str, category: str) -> bool:
+        return category in self.scan(text)
+
+
+def _negated(text: str, start: int) -> bool:
+    clause = _CLAUSE_BREAK.split(text[:start])[-1]
+    return any(word in NEGATIONS for word in _WORD.findall(clause)[-NEGATION_WINDOW:])
+
+
+TIMERS_MATCHER = TimersMatcher()
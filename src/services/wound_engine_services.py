@@ -4,6 +4,8 @@ Phoenix Core - Wound Healing Engine
 from typing import Dict, List, Any
 from datetime import datetime
 
+from services.timers_lexicon import TIMERS_MATCHER
+
 class WoundHealingEngine:
     RESVECH_INTERPRETATION = {
         (0, 5): "Favorable: Herida en buen proceso de cicatrización",
@@ -18,8 +20,8 @@ class WoundHealingEngine:
         moisture = assessment.get("moisture", "Húmedo")
         edge = assessment.get("edge", "Activo")
         recs = []
-        if tissue in ["Necrótico", "Esfacelo"]: recs.append("T: Desbridamiento requerido")
-        if infection in ["Moderada", "Severa"]: recs.append("I: Control de carga bacteriana")
+        if TIMERS_MATCHER.matches(tissue, "tissue_nonviable"): recs.append("T: Desbridamiento requerido")
+        if TIMERS_MATCHER.matches(infection, "infection_significant"): recs.append("I: Control de carga bacteriana")
         return {
             "patient_id": patient_id, "timestamp": datetime.utcnow().isoformat(),
             "methodology": "TIME", "findings": {"T": tissue, "I": infection, "M": moisture, "E": edge},
@@ -1,10 +1,13 @@
 """
 Funciones auxiliares y utilidades
+pandas y streamlit se importan solo en las funciones que los usan: los
+formateadores HTML no deben pagar su carga (cientos de ms) al importar el módulo.
 """
-import pandas as pd
-import streamlit as st
 from datetime import datetime
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def format_triage_badge(nivel: str, nombre: str, color: str) -> str:
@@ -64,7 +67,7 @@ def format_alarm_signs(signos: List[str]) -> str:
     """
 
 
-def export_to_csv(df: pd.DataFrame, filename: str):
+def export_to_csv(df: "pd.DataFrame", filename: str):
     """
     Exporta DataFrame a CSV descargable
     
@@ -72,6 +75,8 @@ def export_to_csv(df: pd.DataFrame, filename: str):
         df: DataFrame a exportar
         filename: Nombre del archivo
     """
+    import streamlit as st
+
     csv = df.to_csv(index=False)
     st.download_button(
         label="📥 Descargar CSV",
@@ -93,6 +98,7 @@ def validate_date_range(start_date, end_date) -> bool:
         True si es válido
     """
     if start_date > end_date:
+        import streamlit as st
         st.error("La fecha inicial debe ser anterior a la fecha final")
         return False
     return True
@@ -144,19 +150,23 @@ def create_metric_card(title: str, value: str, delta: str = None, color: str = "
 
 def show_success_message(message: str):
     """Muestra mensaje de éxito"""
+    import streamlit as st
     st.success(f"✅ {message}")
 
 
 def show_error_message(message: str):
     """Muestra mensaje de error"""
+    import streamlit as st
     st.error(f"❌ {message}")
 
 
 def show_warning_message(message: str):
     """Muestra mensaje de advertencia"""
+    import streamlit as st
     st.warning(f"⚠️ {message}")
 
 
 def show_info_message(message: str):
     """Muestra mensaje informativo"""
+    import streamlit as st
     st.info(f"ℹ️ {message}")